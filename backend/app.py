@@ -1,22 +1,41 @@
+import hmac
+import json
 import os
+import time
 from datetime import datetime, timedelta
+from functools import wraps
 from typing import Tuple
 
-from flask import Flask, request, jsonify, abort
+from flask import Blueprint, Flask, Response, request, jsonify, abort, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
 
 from backend.storage.storage_template import CourtType
 from backend.utils.utilities import (
     add_player_to_timeslot,
+    add_player_to_waitlist,
     remove_player_from_timeslot,
     clear_timeslot,
     list_reservations_between,
+    list_student_reservations,
     ensure_reservations_for_date,
     initialize_reservations_for_next_10_days,
     load_daily_reservations,
+    recover_interrupted_writes,
+    reservation_fingerprint,
+    register_day_provisioner,
+    register_reservation_listener,
 )
+from backend.utils.change_feed import ChangeFeed
+from backend.utils.closures import close_court_in_background, validate_closure
+from backend.utils.occupancy import OccupancyIndex
+from backend.utils.search_index import RoomSearchIndex, build_room_search_index
+from backend.utils.series import create_room_series, load_series, materialize_series_into_day
+from backend.utils.rate_limit import LoadShedder, TokenBucketLimiter
+from backend.utils.response_cache import ResponseCache
 
 DEFAULT_LOOKAHEAD_DAYS = 7
+MAX_ROOM_DURATION_MIN = 24 * 60
 DEFAULT_TIMESLOTS = [f"{hour:02d}:{minute:02d}" for hour in range(0, 24) for minute in (0, 30)]
 DEFAULT_COURTS = {
     "Tennis Courts": (CourtType.TENNIS, 8),
@@ -31,10 +50,42 @@ DEFAULT_COURTS = {
     "Timken Gymnasium*": (CourtType.BASKETBALL, 18),
 }
 
-# Ensure we have an initial set of reservation files.
-initialize_reservations_for_next_10_days(DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+# Hot read endpoints are served from a short-TTL cache tagged by date; every
+# saved mutation drops the entries built from that date.
+response_cache = ResponseCache(
+    ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "2")),
+    max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+)
+
+# Room search is served from an inverted index kept current by the same hook.
+room_search = RoomSearchIndex()
+
+# Clients sync their room caches incrementally from a sequenced change feed.
+# Sequences are per process; days rewritten by another worker reset the feed.
+room_changes = ChangeFeed(
+    max_rooms=int(os.environ.get("CHANGE_FEED_MAX_ROOMS", "5000")),
+    fingerprint=reservation_fingerprint,
+)
+
+# Slot recommendations rank per-day occupancy arrays kept current by the same hook.
+MAX_RECOMMENDATION_DAYS = 28
+
+
+def _provisioned_day(date_dt: datetime):
+    ensure_reservations_for_date(date_dt, DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+    return load_daily_reservations(date_dt)
 
-app = Flask(__name__)
+
+occupancy = OccupancyIndex(load=_provisioned_day, fingerprint=reservation_fingerprint)
+
+# Staff endpoints require this token in X-Admin-Token; unset disables them.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Background snapshots of the live state (0 disables them).
+SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get("SNAPSHOT_INTERVAL_SECONDS", "0"))
+
+# Restore the snapshot at startup; without it caches and indexes fill lazily.
+WARM_START = os.environ.get("WARM_START", "1") != "0"
 
 # Allow the frontend to send cookies/credentials during local development.
 # Flask-CORS requires explicit origins when credentials are enabled.
@@ -43,7 +94,111 @@ _frontend_origins = os.environ.get(
     "http://localhost:5173 http://127.0.0.1:5173 http://localhost:3000 http://127.0.0.1:3000",
 )
 ALLOWED_ORIGINS = [origin.strip() for origin in _frontend_origins.split() if origin.strip()]
-CORS(app, resources={r"/api/*": {"origins": ALLOWED_ORIGINS}}, supports_credentials=True)
+
+api = Blueprint("api", __name__)
+
+
+def _invalidate_cached_responses(change: dict) -> None:
+    response_cache.invalidate(change["date"])
+
+
+def _update_room_search(change: dict) -> None:
+    room_search.update(change["entry"]["id"], change["entry"])
+    room_search.touch(change["date"], reservation_fingerprint(datetime.strptime(change["date"], "%Y-%m-%d")))
+
+
+def create_app(warm_start: bool | None = None) -> Flask:
+    """
+    Build the Flask app and run the startup work that touches storage.
+
+    Importing this module does no disk I/O, so tools and worker processes
+    that only need the helpers stay cheap to start.
+
+    Args:
+        warm_start: Restore the snapshot before serving (defaults to WARM_START)
+
+    Returns:
+        Configured Flask application
+    """
+    # New days get their recurring-room occurrences booked before the first save.
+    register_day_provisioner(materialize_series_into_day)
+    register_reservation_listener(_invalidate_cached_responses)
+    register_reservation_listener(_update_room_search)
+    register_reservation_listener(room_changes.record)
+    register_reservation_listener(occupancy.record_change)
+
+    # Discard temp files left by a crash; real files are replaced atomically.
+    recover_interrupted_writes()
+
+    # Ensure we have an initial set of reservation files.
+    initialize_reservations_for_next_10_days(DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+
+    # Snapshots pull in pickle and walk every file, so load them only here.
+    from backend.utils.snapshot import restore_snapshot, start_periodic_snapshots
+
+    if WARM_START if warm_start is None else warm_start:
+        restore_snapshot()
+    if SNAPSHOT_INTERVAL_SECONDS > 0:
+        start_periodic_snapshots(SNAPSHOT_INTERVAL_SECONDS)
+
+    app = Flask(__name__)
+    CORS(app, resources={r"/api/*": {"origins": ALLOWED_ORIGINS}}, supports_credentials=True)
+    app.register_blueprint(api)
+    return app
+
+
+# Mutations are rate limited per student and per client IP, and shed with 503
+# while too many writes are in flight or recent writes are slow.
+mutation_limiter = TokenBucketLimiter(
+    rate_per_second=float(os.environ.get("MUTATION_RATE_PER_MINUTE", "30")) / 60,
+    burst=int(os.environ.get("MUTATION_BURST", "10")),
+)
+ip_limiter = TokenBucketLimiter(
+    rate_per_second=float(os.environ.get("MUTATION_IP_RATE_PER_MINUTE", "120")) / 60,
+    burst=int(os.environ.get("MUTATION_IP_BURST", "40")),
+)
+write_shedder = LoadShedder(
+    max_in_flight=int(os.environ.get("MAX_INFLIGHT_MUTATIONS", "32")),
+    max_latency_ms=float(os.environ.get("MAX_WRITE_LATENCY_MS", "500")),
+)
+
+
+def _require_admin() -> None:
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        abort(403, description="Admin token required")
+
+
+def _mutation_student_id() -> str:
+    payload = request.get_json(force=True, silent=True) or {}
+    return str(payload.get("student_id") or payload.get("owner_id") or request.args.get("student_id") or "").strip()
+
+
+def guard_mutation(view):
+    """Apply rate limits and load shedding to a mutation route."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not write_shedder.try_enter():
+            raise ServiceUnavailable(description="Server is busy, please retry shortly", retry_after=1)
+
+        started = None
+        try:
+            keys = [(ip_limiter, f"ip:{request.remote_addr}")]
+            student_id = _mutation_student_id()
+            if student_id:
+                keys.append((mutation_limiter, f"student:{student_id}"))
+            for limiter, key in keys:
+                allowed, retry_after = limiter.acquire(key)
+                if not allowed:
+                    raise TooManyRequests(description="Too many requests, slow down", retry_after=max(1, round(retry_after)))
+
+            started = time.monotonic()
+            return view(*args, **kwargs)
+        finally:
+            write_shedder.leave(started)
+
+    return wrapper
 
 
 def _parse_room_id(room_id: str) -> Tuple[str, str, str]:
@@ -54,6 +209,16 @@ def _parse_room_id(room_id: str) -> Tuple[str, str, str]:
         abort(400, description="Invalid room id")
 
 
+def _parse_duration(value) -> int:
+    try:
+        duration = int(value or 60)
+    except (TypeError, ValueError):
+        abort(400, description="duration must be an integer number of minutes")
+    if not 0 < duration <= MAX_ROOM_DURATION_MIN:
+        abort(400, description=f"duration must be between 1 and {MAX_ROOM_DURATION_MIN} minutes")
+    return duration
+
+
 def _serialize_entry(entry: dict, *, include_access_code: bool = False) -> dict:
     time_string = f"{entry['date']} {entry['time']}"
     payload = {
@@ -68,12 +233,37 @@ def _serialize_entry(entry: dict, *, include_access_code: bool = False) -> dict:
         "capacity": entry.get("capacity"),
         "participants": entry.get("participants", []),
         "status": entry.get("status", "available"),
+        "waitlist": entry.get("waitlist", []),
+        "version": entry.get("version", 0),
     }
     if include_access_code and entry.get("access_code"):
         payload["access_code"] = entry.get("access_code")
     return payload
 
 
+def _owns_private(entry: dict, student_id: str) -> bool:
+    return bool(student_id) and entry.get("owner_id") == student_id and entry.get("privacy") == "private"
+
+
+def _if_match_version():
+    """Return the slot version required by an If-Match header, if any."""
+    header = (request.headers.get("If-Match") or "").strip()
+    if not header or header == "*":
+        return None
+    tag = header.removeprefix("W/").strip('"')
+    try:
+        return int(tag)
+    except ValueError:
+        abort(400, description="If-Match must be a room version")
+
+
+def _room_response(room: dict, status: int = 200):
+    response = jsonify({"room": room})
+    response.status_code = status
+    response.headers["ETag"] = f'"{room["version"]}"'
+    return response
+
+
 def _ensure_date(date_dt: datetime):
     ensure_reservations_for_date(date_dt, DEFAULT_COURTS, DEFAULT_TIMESLOTS)
     reservations = load_daily_reservations(date_dt)
@@ -106,36 +296,94 @@ def _build_entry(date_dt: datetime, court_name: str, timeslot: str) -> dict:
         "duration_min": slot.duration_min,
         "status": slot.status,
         "access_code": slot.access_code,
+        "waitlist": list(slot.waitlist),
+        "version": slot.version,
     }
 
 
-@app.get("/api/health")
+@api.get("/api/health")
 def health():
     return jsonify({"status": "ok"})
 
 
-@app.get("/api/rooms")
+def _lookahead_dates(start: datetime, days: int = DEFAULT_LOOKAHEAD_DAYS) -> list[str]:
+    return [(start + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)]
+
+
+@api.get("/api/rooms")
 def list_rooms():
     student_id = str(request.args.get("student_id", "")).strip()
-    entries = list_reservations_between(datetime.now(), DEFAULT_LOOKAHEAD_DAYS)
-    rooms = []
-    for entry in entries:
-        include_code = bool(student_id) and entry.get("owner_id") == student_id and entry.get("privacy") == "private"
-        rooms.append(_serialize_entry(entry, include_access_code=include_code))
-    return jsonify({"rooms": rooms})
+    now = datetime.now()
+
+    def compute():
+        # Days rewritten by other processes reset older cursors, not this one.
+        room_changes.sync(_lookahead_dates(now))
+        # Read the cursor first: changes racing the listing are sent again, never lost.
+        seq = room_changes.seq
+        entries = list_reservations_between(now, DEFAULT_LOOKAHEAD_DAYS)
+        rooms = [_serialize_entry(entry, include_access_code=_owns_private(entry, student_id)) for entry in entries]
+        return {"rooms": rooms, "seq": seq, "epoch": room_changes.epoch}
+
+    key = ("rooms", now.strftime("%Y-%m-%d"), student_id)
+    return jsonify(response_cache.get_or_compute(key, compute, tags=_lookahead_dates(now)))
+
+
+@api.get("/api/rooms/changes")
+def room_changes_since():
+    student_id = str(request.args.get("student_id", "")).strip()
+    try:
+        since = int(request.args.get("since", "0"))
+    except ValueError:
+        abort(400, description="since must be a change sequence number")
+    epoch = request.args.get("epoch") or None
+
+    # Same window as GET /api/rooms, so applying the feed reproduces the listing.
+    dates = _lookahead_dates(datetime.now())
+    window = set(dates)
+    # Changes saved by other worker processes have no seq here: reset instead.
+    room_changes.sync(dates)
+    feed = room_changes.since(since, epoch)
+    feed["rooms"] = [
+        _serialize_entry(entry, include_access_code=_owns_private(entry, student_id))
+        for entry in feed["rooms"]
+        if entry["date"] in window
+    ]
+    feed["removed"] = [room_id for room_id in feed["removed"] if room_id.split("|")[0] in window]
+    return jsonify(feed)
+
+
+@api.get("/api/rooms/search")
+def search_rooms():
+    try:
+        limit = max(1, min(int(request.args.get("limit", 50)), 200))
+    except ValueError:
+        abort(400, description="limit must be an integer")
+
+    result = build_room_search_index(room_search).search(
+        request.args.get("q", ""),
+        sport=request.args.get("type") or None,
+        date=request.args.get("date") or None,
+        date_from=datetime.now().strftime("%Y-%m-%d"),
+        limit=limit,
+    )
+    return jsonify({
+        "rooms": [_serialize_entry(entry) for entry in result["results"]],
+        "total": result["total"],
+        "facets": result["facets"],
+    })
 
 
-@app.get("/api/rooms/<room_id>")
+@api.get("/api/rooms/<room_id>")
 def get_room(room_id):
     student_id = str(request.args.get("student_id", "")).strip()
     date_str, court_name, time_str = _parse_room_id(room_id)
     date_dt = datetime.strptime(date_str, "%Y-%m-%d")
     entry = _build_entry(date_dt, court_name, time_str)
-    include_code = entry.get("owner_id") == student_id and entry.get("privacy") == "private"
-    return jsonify({"room": _serialize_entry(entry, include_access_code=include_code)})
+    return _room_response(_serialize_entry(entry, include_access_code=_owns_private(entry, student_id)))
 
 
-@app.post("/api/rooms")
+@api.post("/api/rooms")
+@guard_mutation
 def create_room():
     payload = request.get_json(force=True) or {}
     for field in ["owner_id", "name", "location", "time"]:
@@ -152,6 +400,8 @@ def create_room():
     except ValueError:
         abort(400, description="time must be in 'YYYY-MM-DD HH:MM' format")
 
+    duration_min = _parse_duration(payload.get("duration"))
+
     reservations = _ensure_date(date_dt)
     court = reservations.root.get(location)
     if not court:
@@ -165,7 +415,7 @@ def create_room():
         payload.get("owner_name"),
         timeslot_type=(payload.get("privacy") or "public").lower(),
         room_name=payload.get("name"),
-        duration_min=int(payload.get("duration", 60) or 60),
+        duration_min=duration_min,
         access_code=payload.get("access_code"),
     )
 
@@ -193,10 +443,11 @@ def create_room():
     serialized = _serialize_entry(entry, include_access_code=include_code)
     if include_code:
         serialized["access_code"] = result.get("access_code")
-    return jsonify({"room": serialized}), 201
+    return _room_response(serialized, 201)
 
 
-@app.post("/api/rooms/<room_id>/attendees")
+@api.post("/api/rooms/<room_id>/attendees")
+@guard_mutation
 def update_attendance(room_id):
     payload = request.get_json(force=True) or {}
     student_id = str(payload.get("student_id", "")).strip()
@@ -215,9 +466,18 @@ def update_attendance(room_id):
         abort(404, description="Timeslot not found")
 
     access_code = payload.get("access_code")
+    expected_version = _if_match_version()
 
     if action == "leave":
-        result = remove_player_from_timeslot(date_dt, court_name, time_str, student_id)
+        result = remove_player_from_timeslot(
+            date_dt, court_name, time_str, student_id, expected_version=expected_version
+        )
+    elif action == "waitlist":
+        result = add_player_to_waitlist(
+            date_dt, court_name, time_str, student_id, None,
+            access_code=access_code,
+            expected_version=expected_version,
+        )
     else:
         result = add_player_to_timeslot(
             date_dt,
@@ -229,18 +489,22 @@ def update_attendance(room_id):
             room_name=slot.room_name,
             duration_min=slot.duration_min or 60,
             access_code=access_code,
+            expected_version=expected_version,
         )
 
+    if result.get("stale"):
+        abort(412, description=result.get("message"))
     if not result.get("success"):
-        status = 409 if "full" in result.get("message", "").lower() else 400
+        message = result.get("message", "").lower()
+        status = 409 if "full" in message or "overlaps" in message else 400
         abort(status, description=result.get("message", "Unable to update attendance"))
 
     entry = _build_entry(date_dt, court_name, time_str)
-    include_code = entry.get("owner_id") == student_id and entry.get("privacy") == "private"
-    return jsonify({"room": _serialize_entry(entry, include_access_code=include_code)})
+    return _room_response(_serialize_entry(entry, include_access_code=_owns_private(entry, student_id)))
 
 
-@app.delete("/api/rooms/<room_id>")
+@api.delete("/api/rooms/<room_id>")
+@guard_mutation
 def delete_room(room_id):
     student_id = str(request.args.get("student_id", "")).strip()
     date_str, court_name, time_str = _parse_room_id(room_id)
@@ -255,22 +519,168 @@ def delete_room(room_id):
     if slot.owner_id and student_id and student_id != slot.owner_id:
         abort(403, description="Only the owner can cancel this room")
 
-    result = clear_timeslot(date_dt, court_name, time_str)
+    result = clear_timeslot(date_dt, court_name, time_str, expected_version=_if_match_version())
+    if result.get("stale"):
+        abort(412, description=result.get("message"))
     if not result.get("success"):
         abort(500, description=result.get("message", "Unable to clear timeslot"))
     return ("", 204)
 
 
-@app.get("/api/profile/<student_id>")
+@api.post("/api/admin/closures")
+def create_closure():
+    _require_admin()
+    payload = request.get_json(force=True) or {}
+    court_name = str(payload.get("court", "")).strip()
+    if court_name not in DEFAULT_COURTS:
+        abort(404, description="Court not found")
+    start_time = str(payload.get("start_time") or "00:00").strip()
+    end_time = str(payload.get("end_time") or "24:00").strip()
+    try:
+        start_date = datetime.strptime(str(payload.get("start_date", "")), "%Y-%m-%d")
+        end_date = datetime.strptime(str(payload.get("end_date") or payload.get("start_date", "")), "%Y-%m-%d")
+    except ValueError:
+        abort(400, description="start_date and end_date must be YYYY-MM-DD")
+    error = validate_closure(start_date, end_date, start_time, end_time)
+    if error:
+        abort(400, description=error)
+
+    # Stream one JSON line per cleared slot (with its removed participants)
+    # as each day commits, then a summary line. The closure itself runs to
+    # completion even if the client stops reading.
+    records = close_court_in_background(court_name, start_date, end_date, start_time, end_time)
+
+    def generate():
+        for record in records:
+            yield json.dumps(record) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@api.post("/api/series")
+@guard_mutation
+def create_series():
+    payload = request.get_json(force=True) or {}
+    for field in ["owner_id", "name", "location", "time"]:
+        if not str(payload.get(field, "")).strip():
+            abort(400, description=f"{field} is required")
+
+    owner_id = str(payload.get("owner_id")).strip()
+    location = payload.get("location")
+    if location not in DEFAULT_COURTS:
+        abort(404, description="Invalid location")
+
+    time_str = str(payload.get("time")).strip()
+    try:
+        date_part, slot_part = time_str.split(" ")
+        start_dt = datetime.strptime(date_part, "%Y-%m-%d")
+    except ValueError:
+        abort(400, description="time must be in 'YYYY-MM-DD HH:MM' format")
+    if slot_part not in DEFAULT_TIMESLOTS:
+        abort(400, description="time must be on the hour or half hour (HH:00 or HH:30)")
+    if start_dt.date() < datetime.now().date():
+        abort(400, description="A series cannot start in the past")
+
+    try:
+        occurrences = int(payload.get("occurrences", 8))
+        interval_days = int(payload.get("interval_days", 7))
+    except (TypeError, ValueError):
+        abort(400, description="occurrences and interval_days must be integers")
+    duration_min = _parse_duration(payload.get("duration"))
+
+    result = create_room_series(
+        owner_id,
+        location,
+        slot_part,
+        start_dt,
+        occurrences,
+        interval_days=interval_days,
+        timeslot_type=(payload.get("privacy") or "public").lower(),
+        room_name=payload.get("name"),
+        duration_min=duration_min,
+        access_code=payload.get("access_code"),
+        skip_conflicts=bool(payload.get("skip_conflicts")),
+        owner_name=payload.get("owner_name"),
+    )
+    if result.get("storage_error"):
+        abort(500, description=result.get("message"))
+    if not result.get("success"):
+        status = 409 if result.get("conflicts") else 400
+        return jsonify({"message": result.get("message"), "conflicts": result.get("conflicts", [])}), status
+
+    return jsonify({
+        "series_id": result["series_id"],
+        "series": result["series"],
+        "materialized": result["materialized"],
+        "conflicts": result["conflicts"],
+    }), 201
+
+
+@api.get("/api/series")
+def list_series():
+    owner_id = str(request.args.get("owner_id", "")).strip()
+    try:
+        collection = load_series()
+    except ValueError:
+        abort(500, description="Unable to load series")
+    series = []
+    for series_id, item in collection.root.items():
+        if owner_id and item.owner_id != owner_id:
+            continue
+        data = item.model_dump()
+        if item.owner_id != owner_id:
+            data.pop("access_code", None)
+        series.append({"id": series_id, **data})
+    return jsonify({"series": series})
+
+
+@api.get("/api/profile/<student_id>")
 def profile(student_id):
     sid = (student_id or "").strip()
-    entries = list_reservations_between(datetime.now(), DEFAULT_LOOKAHEAD_DAYS)
+    entries = list_student_reservations(sid, datetime.now(), DEFAULT_LOOKAHEAD_DAYS)
     owned = [_serialize_entry(entry, include_access_code=True) for entry in entries if entry.get("owner_id") == sid]
     joined = [_serialize_entry(entry) for entry in entries if sid in entry.get("participants", []) and entry.get("owner_id") != sid]
     return jsonify({"owned": owned, "joined": joined})
 
 
-@app.post("/api/rooms/private-access")
+@api.get("/api/recommendations")
+def recommendations():
+    sport = str(request.args.get("type", "")).strip().lower()
+    if sport not in {court_type.value.lower() for court_type in CourtType}:
+        abort(400, description="type must be a sport type such as 'basketball'")
+    student_id = str(request.args.get("student_id", "")).strip()
+    preferred_time = request.args.get("time") or None
+    try:
+        days = int(request.args.get("days", 14))
+        duration = int(request.args.get("duration", 60))
+        limit = int(request.args.get("limit", 10))
+        if preferred_time:
+            datetime.strptime(preferred_time, "%H:%M")
+    except ValueError:
+        abort(400, description="days, duration and limit must be integers and time must be HH:MM")
+    if not 1 <= days <= MAX_RECOMMENDATION_DAYS or not 0 < duration <= MAX_ROOM_DURATION_MIN or limit <= 0:
+        abort(
+            400,
+            description=f"days must be between 1 and {MAX_RECOMMENDATION_DAYS}, duration between 1 and "
+            f"{MAX_ROOM_DURATION_MIN} minutes, and limit positive",
+        )
+
+    now = datetime.now()
+    bookings = list_student_reservations(student_id, now, days) if student_id else []
+    ranked = occupancy.recommend(
+        sport,
+        now,
+        days,
+        bookings=bookings,
+        preferred_time=preferred_time,
+        duration_min=duration,
+        limit=limit,
+        now=now,
+    )
+    return jsonify({"recommendations": ranked})
+
+
+@api.post("/api/rooms/private-access")
 def private_access_lookup():
     payload = request.get_json(force=True) or {}
     access_code = str(payload.get("access_code", "")).strip().upper()
@@ -286,7 +696,7 @@ def private_access_lookup():
     abort(404, description="No room matches that invite code")
 
 
-@app.get("/api/availability/dates")
+@api.get("/api/availability/dates")
 def availability_dates():
     days = int(request.args.get("days", DEFAULT_LOOKAHEAD_DAYS))
     today = datetime.now().date()
@@ -294,7 +704,7 @@ def availability_dates():
     return jsonify({"dates": dates})
 
 
-@app.get("/api/availability/times")
+@api.get("/api/availability/times")
 def availability_times():
     location = request.args.get("location", "")
     date_text = request.args.get("date", datetime.now().strftime("%Y-%m-%d"))
@@ -304,33 +714,38 @@ def availability_times():
     except ValueError:
         abort(400, description="Invalid date format. Use YYYY-MM-DD")
 
-    reservations = _ensure_date(date_dt)
-    now = datetime.now()
-    times = []
-    if location:
-        court = reservations.root.get(location)
-        if not court:
-            return jsonify({"times": []})
-        for time_str, slot in court.timeslots.items():
-            slot_dt = datetime.strptime(f"{date_text} {time_str}", "%Y-%m-%d %H:%M")
-            if slot.owner_id:
-                continue
-            if slot_dt < now:
-                continue
-            times.append(time_str)
-    else:
-        for court in reservations.root.values():
+    def compute():
+        reservations = _ensure_date(date_dt)
+        now = datetime.now()
+        times = []
+        if location:
+            court = reservations.root.get(location)
+            if not court:
+                return {"times": []}
             for time_str, slot in court.timeslots.items():
                 slot_dt = datetime.strptime(f"{date_text} {time_str}", "%Y-%m-%d %H:%M")
                 if slot.owner_id:
                     continue
                 if slot_dt < now:
                     continue
-                if time_str not in times:
-                    times.append(time_str)
-    times.sort()
-    return jsonify({"times": times})
+                times.append(time_str)
+        else:
+            for court in reservations.root.values():
+                for time_str, slot in court.timeslots.items():
+                    slot_dt = datetime.strptime(f"{date_text} {time_str}", "%Y-%m-%d %H:%M")
+                    if slot.owner_id:
+                        continue
+                    if slot_dt < now:
+                        continue
+                    if time_str not in times:
+                        times.append(time_str)
+        times.sort()
+        return {"times": times}
+
+    date_key = date_dt.strftime("%Y-%m-%d")
+    key = ("availability_times", date_key, location)
+    return jsonify(response_cache.get_or_compute(key, compute, tags=[date_key]))
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5050)))
+    create_app().run(host="0.0.0.0", port=int(os.environ.get("PORT", 5050)))
@@ -0,0 +1,113 @@
+"""Compare day file encodings by size and parse time.
+
+Uses the day files in storage when there are any, otherwise a generated
+day with about a third of the slots booked:
+
+    python -m backend.benchmarks.day_files
+    python -m backend.benchmarks.day_files --sample --booked 0.8 --repeat 50
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from backend.app import DEFAULT_COURTS, DEFAULT_TIMESLOTS
+from backend.storage.storage_template import CourtReservations, DailyReservations, TimeSlot
+from backend.utils import file_codecs, utilities
+
+
+def sample_day(booked: float = 0.35, seed: int = 7) -> dict:
+    """Build a day's model_dump() with a share of slots booked by random students."""
+    rng = random.Random(seed)
+    courts = {}
+    for court_name, (court_type, capacity) in DEFAULT_COURTS.items():
+        timeslots = {}
+        for time_str in DEFAULT_TIMESLOTS:
+            slot = TimeSlot(players_id=[], status="available", type="public")
+            if rng.random() < booked:
+                players = [f"{rng.randrange(10**6, 10**7)}" for _ in range(rng.randint(1, capacity))]
+                slot.players_id = players
+                slot.owner_id = players[0]
+                slot.type = rng.choice(["public", "public", "private"])
+                slot.room_name = f"{court_type.value} pickup"
+                slot.reservation_name = slot.room_name
+                slot.duration_min = rng.choice([30, 60, 90])
+                slot.access_code = utilities.generate_access_code() if slot.type == "private" else None
+                slot.version = rng.randint(1, 20)
+                utilities.sync_timeslot_status(slot, capacity)
+            timeslots[time_str] = slot
+        courts[court_name] = CourtReservations(type=court_type, capacity=capacity, timeslots=timeslots)
+    return DailyReservations(courts).model_dump(mode="json")
+
+
+def _median_ms(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(days: list[dict], repeat: int = 20) -> list[dict]:
+    """
+    Encode and decode every day in each available encoding.
+
+    Returns:
+        One row per encoding with total bytes, median encode/decode/validate
+        milliseconds per day, and size/decode time relative to indented JSON
+    """
+    rows = []
+    for encoding in file_codecs.ENCODINGS:
+        if file_codecs.resolve_encoding(encoding) != encoding:
+            continue  # zstd without a zstd module
+        payloads = [file_codecs.encode(day, encoding) for day in days]
+        for day, payload in zip(days, payloads):
+            assert file_codecs.decode(payload) == day, f"{encoding} does not round-trip"
+        rows.append({
+            "encoding": encoding,
+            "bytes": sum(len(payload) for payload in payloads),
+            "encode_ms": statistics.mean(_median_ms(lambda: file_codecs.encode(day, encoding), repeat) for day in days),
+            "decode_ms": statistics.mean(_median_ms(lambda: file_codecs.decode(payload), repeat) for payload in payloads),
+            "load_ms": statistics.mean(
+                _median_ms(lambda: DailyReservations.model_validate(file_codecs.decode(payload)), repeat)
+                for payload in payloads
+            ),
+        })
+
+    baseline = rows[0]
+    for row in rows:
+        row["size_ratio"] = row["bytes"] / baseline["bytes"]
+        row["decode_ratio"] = row["decode_ms"] / baseline["decode_ms"]
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare day file encodings by size and parse time.")
+    parser.add_argument("--sample", action="store_true", help="use a generated day even if files exist")
+    parser.add_argument("--booked", type=float, default=0.35, help="share of booked slots in the generated day")
+    parser.add_argument("--files", type=int, default=10, help="maximum number of stored day files to use")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions per day (median is used)")
+    args = parser.parse_args(argv)
+
+    days = []
+    if not args.sample:
+        for file_date in utilities.list_reservation_dates()[:args.files]:
+            days.append(file_codecs.decode(utilities.get_reservation_filepath(file_date).read_bytes()))
+    source = f"{len(days)} stored day files"
+    if not days:
+        days = [sample_day(args.booked)]
+        source = f"a generated day ({args.booked:.0%} of slots booked)"
+
+    print(f"Day file encodings over {source}:")
+    print(f"  {'encoding':<8} {'bytes':>10} {'size':>6} {'encode':>9} {'decode':>9} {'vs json':>8} {'+validate':>10}")
+    for row in benchmark(days, args.repeat):
+        print(
+            f"  {row['encoding']:<8} {row['bytes']:>10} {row['size_ratio']:>6.0%} "
+            f"{row['encode_ms']:>7.2f}ms {row['decode_ms']:>7.2f}ms {row['decode_ratio']:>7.1f}x {row['load_ms']:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Cold-start profiling for the backend.
+
+Reports the slowest imports of backend.app (via python -X importtime) and
+the median time for a fresh worker process to import the app and run
+create_app() against an empty storage directory. A baseline can be saved
+and later runs compared against it, failing on regressions:
+
+    python -m backend.benchmarks.startup --save-baseline startup.json
+    python -m backend.benchmarks.startup --baseline startup.json --max-regression 0.25
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_SPAWN_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+create_app(warm_start={warm})
+ready = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - started) * 1000, "create_app_ms": (ready - imported) * 1000}}))
+"""
+
+
+def profile_imports(module: str = "backend.app", top: int = 15) -> list[dict]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        The `top` modules by cumulative import time, each as a dict with
+        module, self_ms and cumulative_ms
+    """
+    with tempfile.TemporaryDirectory(prefix="startup-bench-") as storage_dir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            env=_storage_env(storage_dir),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def measure_spawn(runs: int = 5, warm_start: bool = True) -> dict:
+    """
+    Time fresh worker processes importing the app and running create_app().
+
+    Every run gets its own empty storage directory, so create_app() pays for
+    provisioning the first days as a new deployment would.
+
+    Returns:
+        Dictionary with median import_ms, create_app_ms, total_ms and the
+        median wall time of the whole process (process_ms)
+    """
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix="startup-bench-") as storage_dir:
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-c", _SPAWN_SCRIPT.format(warm=warm_start)],
+                cwd=REPO_ROOT,
+                env=_storage_env(storage_dir),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            process_ms = (time.perf_counter() - started) * 1000
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample["total_ms"] = sample["import_ms"] + sample["create_app_ms"]
+        sample["process_ms"] = process_ms
+        samples.append(sample)
+
+    return {
+        key: round(statistics.median(sample[key] for sample in samples), 2)
+        for key in ("import_ms", "create_app_ms", "total_ms", "process_ms")
+    }
+
+
+def compare_to_baseline(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """
+    List the timings that got slower than the baseline by more than max_regression.
+
+    Args:
+        max_regression: Allowed slowdown as a fraction (0.25 = 25%)
+    """
+    regressions = []
+    for key, before in baseline.items():
+        after = current.get(key)
+        if after is None or before <= 0:
+            continue
+        if after > before * (1 + max_regression):
+            regressions.append(f"{key}: {before:.1f} ms -> {after:.1f} ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _storage_env(storage_dir: str) -> dict:
+    env = dict(os.environ)
+    env["RESERVATION_STORAGE_DIR"] = str(storage_dir)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile backend import time and worker startup.")
+    parser.add_argument("--runs", type=int, default=5, help="worker processes to time (median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--cold", action="store_true", help="skip the snapshot restore (WARM_START=0)")
+    parser.add_argument("--save-baseline", type=Path, help="write the timings to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare the timings to this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown vs. baseline")
+    args = parser.parse_args(argv)
+
+    print(f"Slowest imports of backend.app (top {args.top}):")
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    for row in profile_imports(top=args.top):
+        print(f"  {row['cumulative_ms']:8.1f}ms  {row['self_ms']:6.1f}ms  {row['module']}")
+
+    timings = measure_spawn(args.runs, warm_start=not args.cold)
+    print(f"\nWorker startup, median of {args.runs} runs:")
+    for key, value in timings.items():
+        print(f"  {key:<14} {value:8.1f}")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(timings, indent=2))
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(timings, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            print("\nStartup regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nWithin {args.max_regression:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""Concurrency stress test for reservation invariants.
+
+Workers replay seeded random sequences of create, join, leave, waitlist and
+clear operations against a small set of hot slots in a throwaway storage
+directory, then the harness checks every slot on disk:
+
+- no more players than capacity, no duplicate players or waiters
+- the owner is a player (and there is no owner without players)
+- status matches sync_timeslot_status
+- private rooms have an access code, public rooms don't, and nobody got
+  into someone else's private room with a wrong code
+- no lost updates: every successful mutation bumps the slot version once,
+  so each slot's version must equal the number of successes on it, and
+  every student who acted must be registered in users.json
+
+Modes:
+
+- threads: threads call the storage functions in utilities.py directly
+- routes: threads drive the Flask routes through test clients
+- processes: client processes call a live HTTP server started by the harness
+
+    python -m backend.benchmarks.stress --mode threads --workers 200 --ops 50
+    python -m backend.benchmarks.stress --mode processes --workers 8 --ops 200
+
+The operation sequences are fixed by --seed; thread scheduling is not, so
+a failing run should be repeated with the same seed and more operations.
+Storage writers must all live in one process (the server); the processes
+mode therefore runs clients, not writers, in the extra processes.
+"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+WRONG_CODE = "WRONG9"
+
+
+def _configure_environment(storage_dir: str, fsync: bool) -> None:
+    """Point storage at storage_dir and lift the API's rate limits (before any backend import)."""
+    os.environ["RESERVATION_STORAGE_DIR"] = storage_dir
+    os.environ["WRITE_FSYNC"] = "1" if fsync else "0"
+    os.environ["SNAPSHOT_INTERVAL_SECONDS"] = "0"
+    for name in ("MUTATION_RATE_PER_MINUTE", "MUTATION_IP_RATE_PER_MINUTE", "MAX_INFLIGHT_MUTATIONS", "MAX_WRITE_LATENCY_MS"):
+        os.environ[name] = "0"
+
+
+def hot_slots(dates: int, courts: list[str], times: list[str]) -> list[tuple[str, str, str]]:
+    """The (date, court, time) slots the workers fight over, starting tomorrow."""
+    first = datetime.now() + timedelta(days=1)
+    return [
+        ((first + timedelta(days=offset)).strftime("%Y-%m-%d"), court, time_str)
+        for offset in range(dates)
+        for court in courts
+        for time_str in times
+    ]
+
+
+def operations(seed: int, worker: int, count: int, slots: list, students: int) -> list[dict]:
+    """Build a worker's deterministic operation sequence."""
+    rng = random.Random(seed * 100003 + worker)
+    ops = []
+    for _ in range(count):
+        date_str, court, time_str = rng.choice(slots)
+        roll = rng.random()
+        kind = (
+            "create" if roll < 0.25 else
+            "join" if roll < 0.55 else
+            "leave" if roll < 0.8 else
+            "waitlist" if roll < 0.95 else
+            "clear"
+        )
+        ops.append({
+            "kind": kind,
+            "date": date_str,
+            "court": court,
+            "time": time_str,
+            "student": str(1000000 + rng.randrange(students)),
+            "privacy": "private" if rng.random() < 0.3 else "public",
+            "wrong_code": rng.random() < 0.5,
+        })
+    return ops
+
+
+class _Tally:
+    """Successful mutations per slot, violations seen by workers, and latencies."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.successes: Counter = Counter()
+        self.attempts = 0
+        self.students: set[str] = set()
+        self.violations: list[str] = []
+        self.latencies_ms: list[float] = []
+        self.codes: dict[str, str] = {}  # slot id -> access code learned from creates
+
+    def merge(self, other: dict) -> None:
+        with self.lock:
+            self.successes.update(other["successes"])
+            self.attempts += other["attempts"]
+            self.students.update(other["students"])
+            self.violations.extend(other["violations"])
+            self.latencies_ms.extend(other["latencies_ms"])
+
+
+def _worker_result() -> dict:
+    return {"successes": Counter(), "attempts": 0, "students": set(), "violations": [], "latencies_ms": []}
+
+
+def _record(result: dict, op: dict, slot_id: str, ok: bool, joined_private_as_guest: bool, started: float) -> None:
+    result["attempts"] += 1
+    result["latencies_ms"].append((time.perf_counter() - started) * 1000)
+    if not ok:
+        return
+    result["successes"][slot_id] += 1
+    result["students"].add(op["student"])
+    if joined_private_as_guest and op["kind"] == "join" and op["wrong_code"]:
+        result["violations"].append(f"{slot_id}: {op['student']} joined a private room with a wrong code")
+
+
+# --- Direct storage calls ---
+
+def _run_storage_ops(ops: list[dict], tally: _Tally) -> dict:
+    from backend.utils import utilities
+
+    result = _worker_result()
+    for op in ops:
+        date_dt = datetime.strptime(op["date"], "%Y-%m-%d")
+        slot_id = f"{op['date']}|{op['court']}|{op['time']}"
+        code = WRONG_CODE if op["wrong_code"] else tally.codes.get(slot_id)
+        started = time.perf_counter()
+        if op["kind"] in ("create", "join"):
+            response = utilities.add_player_to_timeslot(
+                date_dt, op["court"], op["time"], op["student"], None,
+                timeslot_type=op["privacy"] if op["kind"] == "create" else "public",
+                access_code=None if op["kind"] == "create" else code,
+            )
+            if response["success"] and response.get("access_code"):
+                tally.codes[slot_id] = response["access_code"]
+            guest = response["success"] and response["timeslot_type"] == "private" and response["owner_id"] != op["student"]
+            _record(result, op, slot_id, response["success"], guest, started)
+        elif op["kind"] == "leave":
+            response = utilities.remove_player_from_timeslot(date_dt, op["court"], op["time"], op["student"])
+            _record(result, op, slot_id, response["success"], False, started)
+        elif op["kind"] == "waitlist":
+            response = utilities.add_player_to_waitlist(date_dt, op["court"], op["time"], op["student"], access_code=code)
+            _record(result, op, slot_id, response["success"], False, started)
+        else:
+            response = utilities.clear_timeslot(date_dt, op["court"], op["time"])
+            _record(result, op, slot_id, response["success"], False, started)
+    return result
+
+
+# --- Flask routes (test client or HTTP) ---
+
+def _route_request(op: dict, code: str | None) -> tuple[str, str, dict | None]:
+    room_id = f"{op['date']}|{op['court']}|{op['time']}"
+    if op["kind"] == "create":
+        return "POST", "/api/rooms", {
+            "owner_id": op["student"],
+            "name": "Stress room",
+            "location": op["court"],
+            "time": f"{op['date']} {op['time']}",
+            "privacy": op["privacy"],
+        }
+    if op["kind"] == "clear":
+        return "DELETE", f"/api/rooms/{room_id}?student_id={op['student']}", None
+    action = {"join": "join", "leave": "leave", "waitlist": "waitlist"}[op["kind"]]
+    return "POST", f"/api/rooms/{room_id}/attendees", {"student_id": op["student"], "action": action, "access_code": code}
+
+
+def _run_route_ops(ops: list[dict], send, codes: dict) -> dict:
+    result = _worker_result()
+    for op in ops:
+        slot_id = f"{op['date']}|{op['court']}|{op['time']}"
+        code = WRONG_CODE if op["wrong_code"] else codes.get(slot_id)
+        method, path, body = _route_request(op, code)
+        started = time.perf_counter()
+        status, payload = send(method, path, body)
+        ok = 200 <= status < 300
+        room = (payload or {}).get("room") or {}
+        if ok and room.get("access_code") and op["kind"] == "create":
+            codes[slot_id] = room["access_code"]
+        guest = ok and room.get("privacy") == "private" and room.get("owner_id") != op["student"]
+        _record(result, op, slot_id, ok, guest, started)
+    return result
+
+
+def _test_client_sender(client):
+    def send(method, path, body):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+    return send
+
+
+def _http_sender(base_url: str):
+    def send(method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            base_url + urllib.request.quote(path, safe="/?=&"),
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                text = response.read()
+                return response.status, json.loads(text) if text else None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+    return send
+
+
+def _http_client_process(args: tuple) -> dict:
+    base_url, ops = args
+    return _run_route_ops(ops, _http_sender(base_url), {})
+
+
+# --- Invariant checks ---
+
+def check_invariants(slots: list, tally: _Tally) -> list[str]:
+    """Check every hot slot on disk and the registered users against what workers saw."""
+    from backend.utils import file_codecs, utilities
+
+    violations = list(tally.violations)
+    by_date: dict[str, dict] = {}
+    for date_str, court_name, time_str in slots:
+        if date_str not in by_date:
+            filepath = utilities.get_reservation_filepath(datetime.strptime(date_str, "%Y-%m-%d"))
+            by_date[date_str] = file_codecs.decode(filepath.read_bytes())
+        court = by_date[date_str][court_name]
+        slot = court["timeslots"][time_str]
+        slot_id = f"{date_str}|{court_name}|{time_str}"
+        players, waitlist, capacity = slot["players_id"], slot["waitlist"], court["capacity"]
+
+        if len(players) > capacity:
+            violations.append(f"{slot_id}: {len(players)} players exceed capacity {capacity}")
+        if len(set(players)) != len(players) or len(set(waitlist)) != len(waitlist):
+            violations.append(f"{slot_id}: duplicate players or waiters")
+        if set(players) & set(waitlist):
+            violations.append(f"{slot_id}: students both playing and waiting")
+        if players and slot["owner_id"] not in players:
+            violations.append(f"{slot_id}: owner {slot['owner_id']} is not a player")
+        if not players and slot["owner_id"]:
+            violations.append(f"{slot_id}: owner {slot['owner_id']} of an empty slot")
+        expected_status = "full" if len(players) >= capacity else "available"
+        if slot["status"] != expected_status:
+            violations.append(f"{slot_id}: status {slot['status']} with {len(players)}/{capacity} players")
+        if players and slot["type"] == "private" and not slot["access_code"]:
+            violations.append(f"{slot_id}: private room without an access code")
+        if slot["type"] == "public" and slot["access_code"]:
+            violations.append(f"{slot_id}: public room with an access code")
+        if slot["version"] != tally.successes[slot_id]:
+            violations.append(f"{slot_id}: version {slot['version']} but {tally.successes[slot_id]} successful mutations (lost update)")
+
+    users = utilities.load_users()
+    missing = tally.students - set(users.root if users else {})
+    if missing:
+        violations.append(f"{len(missing)} students who booked are missing from users.json (lost registration)")
+    return violations
+
+
+# --- Driver ---
+
+def run(mode: str, workers: int, ops_per_worker: int, seed: int, students: int, dates: int) -> dict:
+    from backend.app import DEFAULT_COURTS, create_app
+
+    app = create_app(warm_start=False)
+    courts = list(DEFAULT_COURTS)[:2]
+    slots = hot_slots(dates, courts, ["17:00", "17:30", "18:00"])
+    schedules = [operations(seed, worker, ops_per_worker, slots, students) for worker in range(workers)]
+    tally = _Tally()
+
+    started = time.perf_counter()
+    if mode == "threads":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda ops: _run_storage_ops(ops, tally), schedules):
+                tally.merge(result)
+    elif mode == "routes":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda ops: _run_route_ops(ops, _test_client_sender(app.test_client()), tally.codes), schedules):
+                tally.merge(result)
+    else:
+        import logging
+        from werkzeug.serving import make_server
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                for result in pool.imap_unordered(_http_client_process, [(base_url, ops) for ops in schedules]):
+                    tally.merge(result)
+        finally:
+            server.shutdown()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(tally.latencies_ms)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "operations": tally.attempts,
+        "successes": sum(tally.successes.values()),
+        "seconds": elapsed,
+        "ops_per_second": tally.attempts / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        "violations": check_invariants(slots, tally),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stress reservation storage and check its invariants.")
+    parser.add_argument("--mode", choices=["threads", "routes", "processes"], default="threads")
+    parser.add_argument("--workers", type=int, default=100, help="threads, or client processes")
+    parser.add_argument("--ops", type=int, default=50, help="operations per worker")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--students", type=int, default=40, help="size of the student pool")
+    parser.add_argument("--dates", type=int, default=2, help="days the hot slots span")
+    parser.add_argument("--fsync", action="store_true", help="fsync every write (off by default)")
+    args = parser.parse_args(argv)
+
+    storage_dir = tempfile.mkdtemp(prefix="stress-")
+    _configure_environment(storage_dir, args.fsync)
+    report = run(args.mode, args.workers, args.ops, args.seed, args.students, args.dates)
+
+    print(
+        f"{report['mode']}: {report['operations']} operations by {report['workers']} workers "
+        f"({report['successes']} succeeded) in {report['seconds']:.2f}s"
+    )
+    print(f"  throughput {report['ops_per_second']:.0f} ops/s, latency p50 {report['p50_ms']:.2f}ms p99 {report['p99_ms']:.2f}ms")
+    print(f"  storage: {storage_dir}")
+    if report["violations"]:
+        print(f"  {len(report['violations'])} invariant violations:")
+        for violation in report["violations"][:50]:
+            print(f"    {violation}")
+        return 1
+    print("  all invariants hold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
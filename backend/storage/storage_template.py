@@ -40,6 +40,8 @@ class TimeSlot(BaseModel):
     access_code: str | None = None
     reservation_name: str = ""  # Optional forward-facing session title supplied by hosts
     court_type: str = ""  # Optional activity label supplied by hosts
+    waitlist: List[str] = Field(default_factory=list)  # Student IDs queued (FIFO) for a spot when full
+    version: int = 0  # Bumped on every change; clients send it back via If-Match
 
 
 # --- CourtReservations model ---
@@ -53,3 +55,30 @@ class CourtReservations(BaseModel):
 class DailyReservations(RootModel[Dict[str, CourtReservations]]):
     """Mapping of court_name -> CourtReservation"""
     pass
+
+
+# --- RoomSeries model ---
+class RoomSeries(BaseModel):
+    """
+    A recurring room: the same court and time every interval_days from start_date.
+    Occurrences are materialized into day files as those days are provisioned.
+    """
+    owner_id: str
+    court: str
+    time: str  # HH:MM
+    start_date: str  # YYYY-MM-DD of the first occurrence
+    interval_days: int = 7
+    occurrences: int = 1
+    type: Literal["private", "public"] = "public"
+    room_name: str | None = None
+    duration_min: int | None = None
+    access_code: str | None = None
+    reservation_name: str = ""
+    court_type: str = ""
+    skipped_dates: List[str] = Field(default_factory=list)  # Occurrences dropped because of conflicts
+
+
+# --- RoomSeriesCollection root model ---
+class RoomSeriesCollection(RootModel[Dict[str, RoomSeries]]):
+    """Mapping of series_id -> RoomSeries"""
+    pass
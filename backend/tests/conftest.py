@@ -0,0 +1,63 @@
+"""Shared fixtures: every test gets its own storage directory and day store.
+
+Run from the repository root with ``python -m pytest backend/tests``.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.storage.storage_template import CourtType
+from backend.utils import utilities
+from backend.utils.timeline_index import StudentTimelineIndex
+from backend.utils.write_behind import GroupCommitStore
+
+COURTS = {
+    "Scot Center* ∆": (CourtType.BASKETBALL, 4),
+    "Timken Gymnasium*": (CourtType.BASKETBALL, 4),
+    "Tennis Courts": (CourtType.TENNIS, 4),
+    "Softball Diamond": (CourtType.BASEBALL, 4),
+}
+TIMESLOTS = ["18:00", "18:30", "19:00", "19:30"]
+
+
+def _new_store(max_delay_ms: float = 2.0) -> GroupCommitStore:
+    return GroupCommitStore(
+        load=utilities.load_daily_reservations,
+        # Looked up on every write, so tests can patch the writer.
+        write=lambda date, data: utilities._commit_daily_reservations(date, data),
+        fingerprint=utilities.reservation_fingerprint,
+        max_delay_ms=max_delay_ms,
+    )
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Point utilities at an empty storage tree with a fresh day store and indexes."""
+    monkeypatch.setattr(utilities, "STORAGE_DIR", tmp_path)
+    monkeypatch.setattr(utilities, "RESERVATIONS_DIR", tmp_path / "reservations")
+    monkeypatch.setattr(utilities, "USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr(utilities, "student_timeline", StudentTimelineIndex())
+    monkeypatch.setattr(utilities, "_json_cache", {})
+    monkeypatch.setattr(utilities, "day_store", _new_store())
+    return tmp_path
+
+
+@pytest.fixture
+def make_store(storage, monkeypatch):
+    """Install a day store with the given batch delay; writes go through utilities._commit_daily_reservations."""
+
+    def make(max_delay_ms: float = 2.0) -> GroupCommitStore:
+        store = _new_store(max_delay_ms)
+        monkeypatch.setattr(utilities, "day_store", store)
+        return store
+
+    return make
+
+
+@pytest.fixture
+def day(storage):
+    """A provisioned day (tomorrow) with a few small courts."""
+    date = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    utilities.ensure_reservations_for_date(date, COURTS, TIMESLOTS)
+    return date
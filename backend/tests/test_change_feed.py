@@ -0,0 +1,48 @@
+"""Change feed cursors against day files written elsewhere."""
+
+from backend.utils import utilities
+from backend.utils.change_feed import ChangeFeed
+
+COURT = "Scot Center* ∆"
+
+
+def _feed() -> ChangeFeed:
+    feed = ChangeFeed(fingerprint=utilities.reservation_fingerprint)
+    utilities.register_reservation_listener(feed.record)
+    return feed
+
+
+def test_local_changes_are_sequenced_without_reset(storage, day, monkeypatch):
+    monkeypatch.setattr(utilities, "_reservation_listeners", [])
+    feed = _feed()
+    date = f"{day:%Y-%m-%d}"
+    assert not feed.sync([date])
+    cursor = feed.seq
+
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None, room_name="Hoops")["success"]
+
+    assert not feed.sync([date])
+    changes = feed.since(cursor, feed.epoch)
+    assert not changes["reset"]
+    assert [room["id"] for room in changes["rooms"]] == [f"{date}|{COURT}|18:00"]
+
+
+def test_day_rewritten_by_another_process_resets_older_cursors(storage, day, monkeypatch):
+    monkeypatch.setattr(utilities, "_reservation_listeners", [])
+    feed = _feed()
+    date = f"{day:%Y-%m-%d}"
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None, room_name="Hoops")["success"]
+    feed.sync([date])
+    cursor = feed.seq
+
+    # Another worker process books a room straight into the day file.
+    reservations = utilities.load_daily_reservations(day)
+    slot = reservations.root["Timken Gymnasium*"].timeslots["19:00"]
+    slot.players_id, slot.owner_id, slot.room_name = ["1000002"], "1000002", "Volley"
+    assert utilities.save_daily_reservations(day, reservations)
+
+    assert feed.sync([date])
+    assert feed.since(cursor, feed.epoch)["reset"]
+    # The cursor handed out with the refetch is good again.
+    assert not feed.sync([date])
+    assert not feed.since(feed.seq, feed.epoch)["reset"]
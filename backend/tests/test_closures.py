@@ -0,0 +1,63 @@
+"""Court closure time ranges."""
+
+import pytest
+
+from backend.utils import utilities
+from backend.utils.closures import close_court, validate_closure
+
+COURT = "Scot Center* ∆"
+
+
+def _book(day, time_str: str, student: str, duration_min: int = 60) -> None:
+    result = utilities.add_player_to_timeslot(day, COURT, time_str, student, None, duration_min=duration_min)
+    assert result["success"]
+
+
+def _cleared_times(day, start_time: str, end_time: str) -> list[str]:
+    result = utilities.clear_timeslots(day, COURT, start_time, end_time)
+    assert result["success"]
+    return [slot["time"] for slot in result["cleared"]]
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time, error",
+    [
+        ("08:00", "9:30", None),
+        ("9:30", "10:00", None),
+        ("9:30", "08:00", "end_time must be after start_time"),
+        ("10:00", "10:00", "end_time must be after start_time"),
+        ("00:00", "24:00", None),
+        ("8am", "10:00", "Times must be in HH:MM format"),
+    ],
+)
+def test_validate_compares_times_numerically(day, start_time, end_time, error):
+    assert validate_closure(day, day, start_time, end_time) == error
+
+
+def test_unpadded_hours_do_not_widen_the_range(storage, day):
+    _book(day, "18:00", "1000001")
+    _book(day, "19:30", "1000002")
+
+    # As strings, "9:00" sorts after "18:00" and "19:30" after "18:30".
+    assert _cleared_times(day, "9:00", "18:30") == ["18:00"]
+    assert utilities.load_daily_reservations(day).root[COURT].timeslots["19:30"].players_id == ["1000002"]
+
+
+def test_rooms_running_into_the_window_are_cancelled(storage, day):
+    _book(day, "18:00", "1000001", duration_min=90)
+    _book(day, "18:30", "1000002", duration_min=30)
+    _book(day, "19:30", "1000003")
+
+    assert _cleared_times(day, "19:00", "19:30") == ["18:00"]
+    assert _cleared_times(day, "19:00", "24:00") == ["19:30"]
+
+
+def test_close_court_reports_the_cleared_rooms(storage, day):
+    _book(day, "18:00", "1000001")
+    _book(day, "19:00", "1000002")
+
+    records = list(close_court(COURT, day, day, "18:30", "19:30"))
+
+    assert [record["time"] for record in records[:-1]] == ["18:00", "19:00"]
+    assert records[-1]["summary"]["cleared_slots"] == 2
+    assert records[-1]["summary"]["affected_participants"] == 2
@@ -0,0 +1,20 @@
+"""Occupancy arrays and slot recommendations."""
+
+from datetime import timedelta
+
+from backend.utils import utilities
+from backend.utils.occupancy import MAX_DURATION_MIN, OccupancyIndex
+
+
+def test_out_of_range_stored_durations_are_clamped(storage, day):
+    for time_str, duration_min in (("18:00", 70000), ("19:00", -5)):
+        result = utilities.add_player_to_timeslot(
+            day, "Scot Center* ∆", time_str, "1000001", None, duration_min=duration_min
+        )
+        assert result["success"]
+
+    index = OccupancyIndex(load=utilities.load_daily_reservations, fingerprint=utilities.reservation_fingerprint)
+    ranked = index.recommend("basketball", day, 1, now=day - timedelta(days=1), limit=100)
+
+    joins = {item["time"]: item["duration_min"] for item in ranked if item["court"] == "Scot Center* ∆" and item["kind"] == "join"}
+    assert joins == {"18:00": MAX_DURATION_MIN, "19:00": 1}
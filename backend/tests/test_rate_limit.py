@@ -0,0 +1,116 @@
+"""Token buckets, load shedding and the mutation guard, on a fake clock."""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from backend import app as app_module
+from backend.utils import rate_limit
+from backend.utils.rate_limit import LoadShedder, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Swap the modules' clock only; the real one still drives thread waits.
+    for module in (rate_limit, app_module):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+def test_bucket_bursts_then_refills(clock):
+    limiter = TokenBucketLimiter(rate_per_second=2, burst=3)
+
+    assert [limiter.acquire("a")[0] for _ in range(4)] == [True, True, True, False]
+    clock.advance(0.5)
+    assert limiter.acquire("a") == (True, 0.0)
+    assert not limiter.acquire("a")[0]
+    clock.advance(10)
+    # Refill is capped at the burst size.
+    assert [limiter.acquire("a")[0] for _ in range(4)] == [True, True, True, False]
+    # Keys have independent buckets.
+    assert limiter.acquire("b")[0]
+
+
+def test_retry_after_is_time_until_next_token(clock):
+    limiter = TokenBucketLimiter(rate_per_second=0.5, burst=1)
+    assert limiter.acquire("a")[0]
+
+    clock.advance(0.5)
+    allowed, retry_after = limiter.acquire("a")
+
+    assert not allowed
+    assert retry_after == pytest.approx(1.5)
+    clock.advance(retry_after)
+    assert limiter.acquire("a")[0]
+
+
+def test_in_flight_cap_is_never_exceeded(clock):
+    shedder = LoadShedder(max_in_flight=3, max_latency_ms=0)
+    barrier = threading.Barrier(20)
+
+    def enter(_):
+        barrier.wait()
+        return shedder.try_enter()
+
+    with ThreadPoolExecutor(20) as pool:
+        admitted = sum(pool.map(enter, range(20)))
+
+    assert admitted == 3 and shedder.in_flight == 3
+    shedder.leave()
+    assert shedder.try_enter()
+    assert not shedder.try_enter()
+
+
+def test_slow_writes_shed_until_latency_recovers(clock):
+    shedder = LoadShedder(max_in_flight=0, max_latency_ms=100, smoothing=1.0, recovery_seconds=1.0)
+
+    assert shedder.try_enter()
+    started = clock()
+    clock.advance(0.3)
+    shedder.leave(started)
+    assert shedder.latency_ms == pytest.approx(300)
+    assert not shedder.try_enter()
+
+    clock.advance(0.9)
+    assert not shedder.try_enter()
+
+    clock.advance(0.2)
+    assert shedder.try_enter()
+    assert shedder.latency_ms == 0.0
+
+    # A write that never ran (e.g. rate limited) records no latency.
+    clock.advance(0.5)
+    shedder.leave()
+    assert shedder.in_flight == 0 and shedder.latency_ms == 0.0
+
+
+def test_guard_sets_retry_after_and_releases_in_flight(clock, storage, monkeypatch):
+    client = app_module.create_app(warm_start=False).test_client()
+    monkeypatch.setattr(app_module, "write_shedder", LoadShedder(max_in_flight=1, max_latency_ms=0))
+    monkeypatch.setattr(app_module, "mutation_limiter", TokenBucketLimiter(rate_per_second=0.25, burst=1))
+    payload = {"student_id": "1000001", "name": "Hoops", "location": "Scot Center* ∆", "time": "bad"}
+
+    assert client.post("/api/rooms", json=payload).status_code == 400
+    limited = client.post("/api/rooms", json=payload)
+
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "4"
+    # Neither the rejected nor the limited request holds an in-flight slot.
+    assert app_module.write_shedder.in_flight == 0
+
+    assert app_module.write_shedder.try_enter()
+    assert client.post("/api/rooms", json={**payload, "student_id": "1000002"}).status_code == 503
@@ -0,0 +1,26 @@
+"""Response cache bounds."""
+
+import time
+
+from backend.utils.response_cache import ResponseCache
+
+
+def test_entry_count_is_capped():
+    cache = ResponseCache(ttl_seconds=60, max_entries=100)
+    for student in range(2000):
+        cache.get_or_compute(("rooms", student), lambda: {"rooms": []})
+
+    assert len(cache._entries) == 100
+    # The most recent keys survive.
+    assert ("rooms", 1999) in cache._entries and ("rooms", 0) not in cache._entries
+
+
+def test_expired_entries_are_swept():
+    cache = ResponseCache(ttl_seconds=0.05)
+    for student in range(500):
+        cache.get_or_compute(("rooms", student), lambda: {"rooms": []})
+    time.sleep(0.06)
+
+    cache.get_or_compute(("rooms", "next"), lambda: {"rooms": []})
+
+    assert list(cache._entries) == [("rooms", "next")]
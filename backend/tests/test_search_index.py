@@ -0,0 +1,28 @@
+"""Room search index freshness against day files written elsewhere."""
+
+from backend.utils import utilities
+from backend.utils.search_index import RoomSearchIndex, build_room_search_index
+
+
+def test_search_sees_rooms_written_by_another_process(storage, day):
+    index = build_room_search_index(RoomSearchIndex())
+    assert index.search("hoops")["total"] == 0
+
+    # Another worker process books a room straight into the day file.
+    reservations = utilities.load_daily_reservations(day)
+    slot = reservations.root["Scot Center* ∆"].timeslots["18:00"]
+    slot.players_id, slot.owner_id, slot.room_name = ["1000001"], "1000001", "Evening Hoops"
+    assert utilities.save_daily_reservations(day, reservations)
+
+    results = build_room_search_index(index).search("hoops")["results"]
+    assert [entry["room_name"] for entry in results] == ["Evening Hoops"]
+
+
+def test_days_removed_from_disk_are_dropped(storage, day):
+    assert utilities.add_player_to_timeslot(day, "Scot Center* ∆", "18:00", "1000001", None, room_name="Hoops")["success"]
+    index = build_room_search_index(RoomSearchIndex())
+    assert index.search("hoops")["total"] == 1
+
+    utilities.get_reservation_filepath(day).unlink()
+
+    assert build_room_search_index(index).search("hoops")["total"] == 0
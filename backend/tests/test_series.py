@@ -0,0 +1,57 @@
+"""Recurring room series validation and provisioning."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import DEFAULT_COURTS, DEFAULT_TIMESLOTS, create_app
+from backend.utils import utilities
+from backend.utils.series import create_room_series, get_series_filepath, materialize_series_into_day
+
+COURT = "Scot Center* ∆"
+
+
+@pytest.fixture
+def client(storage):
+    return create_app(warm_start=False).test_client()
+
+
+def _series_payload(time_str: str) -> dict:
+    return {"owner_id": "1000001", "name": "Pickup", "location": COURT, "time": time_str, "occurrences": 2}
+
+
+@pytest.mark.parametrize("offset_days, time_str", [(1, "18:15"), (-1, "18:00"), (1, "7:00")])
+def test_series_outside_slots_or_in_the_past_are_rejected(client, offset_days, time_str):
+    date_str = (datetime.now() + timedelta(days=offset_days)).strftime("%Y-%m-%d")
+
+    response = client.post("/api/series", json=_series_payload(f"{date_str} {time_str}"))
+
+    assert response.status_code == 400
+    assert not get_series_filepath().exists()
+
+
+def test_series_on_a_slot_from_today_is_created(client):
+    date_str = datetime.now().strftime("%Y-%m-%d")
+
+    response = client.post("/api/series", json=_series_payload(f"{date_str} 23:30"))
+
+    assert response.status_code == 201
+
+
+def test_day_is_not_saved_while_a_provisioner_fails(storage, monkeypatch):
+    monkeypatch.setattr(utilities, "_day_provisioners", [materialize_series_into_day])
+    start = datetime.combine(datetime.now().date() + timedelta(days=30), datetime.min.time())
+    utilities.ensure_reservations_for_date(start, DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+    result = create_room_series("1000001", COURT, "18:00", start, 2)
+    assert result["success"]
+    later = start + timedelta(days=7)
+
+    series_json = get_series_filepath().read_bytes()
+    get_series_filepath().write_text("{torn")
+    utilities.ensure_reservations_for_date(later, DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+    assert not utilities.get_reservation_filepath(later).exists()
+
+    get_series_filepath().write_bytes(series_json)
+    reservations = utilities.ensure_reservations_for_date(later, DEFAULT_COURTS, DEFAULT_TIMESLOTS)
+    assert reservations.root[COURT].timeslots["18:00"].owner_id == "1000001"
+    assert utilities.load_daily_reservations(later).root[COURT].timeslots["18:00"].owner_id == "1000001"
@@ -0,0 +1,39 @@
+"""Snapshot restore of the student timeline."""
+
+from backend.utils import snapshot, utilities
+from backend.utils.timeline_index import StudentTimelineIndex
+
+COURT = "Scot Center* ∆"
+
+
+def test_timeline_days_older_than_the_snapshot_files_are_reindexed(storage, day, monkeypatch):
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None)["success"]
+    utilities.ensure_student_timeline()
+
+    # A write lands after the timeline was captured but before the file
+    # cache is copied, so the snapshot pairs old entries with the new file.
+    reservations = utilities.load_daily_reservations(day)
+    reservations.root[COURT].timeslots["19:00"].players_id = ["1000001"]
+    assert utilities.save_daily_reservations(day, reservations)
+    with monkeypatch.context() as patch:
+        patch.setattr(utilities, "ensure_student_timeline", lambda *args: utilities.student_timeline)
+        assert snapshot.write_snapshot()
+
+    monkeypatch.setattr(utilities, "student_timeline", StudentTimelineIndex())
+    monkeypatch.setattr(utilities, "_json_cache", {})
+    result = snapshot.restore_snapshot()
+
+    assert result["success"] and result["reloaded"] == 1
+    times = [entry["time"] for entry in utilities.list_student_reservations("1000001", day, 1)]
+    assert times == ["18:00", "19:00"]
+
+
+def test_unchanged_days_are_restored_without_reading_files(storage, day, monkeypatch):
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None)["success"]
+    assert snapshot.write_snapshot()
+
+    monkeypatch.setattr(utilities, "student_timeline", StudentTimelineIndex())
+    result = snapshot.restore_snapshot()
+
+    assert result["success"] and result["reloaded"] == 0
+    assert len(utilities.list_student_reservations("1000001", day, 1)) == 1
@@ -0,0 +1,48 @@
+"""Student timeline index freshness against day files written elsewhere."""
+
+from backend.utils import utilities
+
+COURT = "Scot Center* ∆"
+
+
+def _write_behind_our_back(day, time_str: str, student: str) -> None:
+    """Book a slot the way another worker process would: straight to the day file."""
+    reservations = utilities.load_daily_reservations(day)
+    slot = reservations.root[COURT].timeslots[time_str]
+    slot.players_id.append(student)
+    slot.owner_id = slot.owner_id or student
+    slot.version += 1
+    assert utilities.save_daily_reservations(day, reservations)
+
+
+def test_profile_sees_joins_written_by_another_process(storage, day):
+    assert utilities.list_student_reservations("1000001", day, 1) == []
+
+    _write_behind_our_back(day, "18:00", "1000001")
+
+    assert [entry["id"] for entry in utilities.list_student_reservations("1000001", day, 1)] == [
+        f"{day:%Y-%m-%d}|{COURT}|18:00"
+    ]
+
+
+def test_double_booking_check_sees_joins_written_by_another_process(storage, day, monkeypatch):
+    monkeypatch.setattr(utilities, "PREVENT_DOUBLE_BOOKING", True)
+    utilities.ensure_student_timeline()
+
+    _write_behind_our_back(day, "18:00", "1000001")
+    result = utilities.add_player_to_timeslot(day, "Timken Gymnasium*", "18:30", "1000001", None)
+
+    assert not result["success"]
+    assert result["message"].startswith("Overlaps your booking")
+
+
+def test_own_writes_do_not_force_a_reindex(storage, day, monkeypatch):
+    utilities.ensure_student_timeline()
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None)["success"]
+
+    loads = []
+    load = utilities.load_daily_reservations
+    monkeypatch.setattr(utilities, "load_daily_reservations", lambda date: loads.append(date) or load(date))
+
+    assert len(utilities.list_student_reservations("1000001", day, 1)) == 1
+    assert loads == []
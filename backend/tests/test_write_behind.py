@@ -0,0 +1,137 @@
+"""Crash recovery and durability of group-committed reservation writes."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+import pytest
+
+from backend.utils import utilities
+from backend.utils.file_codecs import decode
+
+COURT = "Scot Center* ∆"
+
+
+def _players_on_disk(date, court=COURT, time_str="18:00") -> list[str]:
+    data = decode(utilities.get_reservation_filepath(date).read_bytes())
+    return data[court]["timeslots"][time_str]["players_id"]
+
+
+def _join_concurrently(date, joins: list[tuple[str, str, str]]) -> list[dict]:
+    """Run (court, time, student) joins at once; a barrier lines them up for one batch."""
+    barrier = threading.Barrier(len(joins))
+
+    def join(args):
+        court, time_str, student = args
+        barrier.wait()
+        return utilities.add_player_to_timeslot(date, court, time_str, student, None)
+
+    with ThreadPoolExecutor(len(joins)) as pool:
+        return list(pool.map(join, joins))
+
+
+def _leave_tmp(path, data: bytes, age_seconds: float):
+    """Write a leftover temp file whose last modification was age_seconds ago."""
+    path.write_bytes(data)
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_failed_replace_leaves_no_tmp_and_keeps_committed_file(make_store, day, monkeypatch):
+    make_store()
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None)["success"]
+    assert utilities.get_or_register_user("1000002", None)[0]
+
+    def crash(src, dst):
+        raise OSError("simulated crash")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(utilities.os, "replace", crash)
+        result = utilities.add_player_to_timeslot(day, COURT, "18:00", "1000002", None)
+
+    assert not result["success"]
+    assert list(utilities.RESERVATIONS_DIR.glob("*.tmp")) == []
+    assert _players_on_disk(day) == ["1000001"]
+
+
+def test_concurrent_writers_use_distinct_tmp_files(storage, day):
+    filepath = utilities.get_reservation_filepath(day)
+    names = {utilities.temp_path_for(filepath).name for _ in range(100)}
+
+    assert len(names) == 100
+    assert all(name.startswith(filepath.name + ".") and name.endswith(".tmp") for name in names)
+
+
+def test_recovery_removes_only_stale_tmp_files(storage, day):
+    filepath = utilities.get_reservation_filepath(day)
+    committed = filepath.read_bytes()
+    stale = [
+        # Crash-torn leftovers, one in the legacy fixed-name format.
+        _leave_tmp(utilities.temp_path_for(filepath), committed[: len(committed) // 2], 3600),
+        _leave_tmp(filepath.with_name(filepath.name + ".tmp"), committed[:10], 3600),
+        _leave_tmp(storage / "users.json.123.abcd1234.tmp", b'{"1000001": {"na', 3600),
+    ]
+    # Another worker may still be writing this one.
+    in_progress = _leave_tmp(utilities.temp_path_for(filepath), committed[:10], 0)
+
+    assert utilities.recover_interrupted_writes(min_age_seconds=300) == len(stale)
+    assert not any(path.exists() for path in stale)
+    assert in_progress.exists()
+    assert filepath.read_bytes() == committed
+    assert utilities.load_daily_reservations(day) is not None
+
+
+def test_failed_write_fails_every_mutation_in_the_batch(make_store, day, monkeypatch):
+    store = make_store(max_delay_ms=100)
+    assert utilities.add_player_to_timeslot(day, COURT, "18:00", "1000001", None)["success"]
+
+    writes = []
+
+    def failing_write(date, data):
+        writes.append(date)
+        return False
+
+    courts = list(utilities.load_daily_reservations(day).root)
+    with monkeypatch.context() as patch:
+        patch.setattr(utilities, "_commit_daily_reservations", failing_write)
+        results = _join_concurrently(day, [(court, "19:00", f"200000{i}") for i, court in enumerate(courts)])
+
+    assert len(writes) == 1
+    assert [result["success"] for result in results] == [False] * len(courts)
+    assert all(result["message"] == "Error saving reservation" for result in results)
+    # Post-commit callbacks never ran for the failed batch.
+    assert utilities.list_student_reservations("2000000", day, 1) == []
+
+    # The live copy was dropped and is reloaded from disk on next use.
+    with store.transaction(day) as txn:
+        live = txn.reservations
+        assert live.root[COURT].timeslots["18:00"].players_id == ["1000001"]
+        assert all(not court.timeslots["19:00"].players_id for court in live.root.values())
+
+
+@pytest.mark.parametrize("fsync", [False, True])
+@pytest.mark.parametrize("delay_ms", [0, 20])
+def test_acknowledged_mutations_are_on_disk(make_store, day, monkeypatch, fsync, delay_ms):
+    monkeypatch.setattr(utilities, "FSYNC_WRITES", fsync)
+    make_store(max_delay_ms=delay_ms)
+    students = [f"300000{i}" for i in range(4)]
+
+    results = _join_concurrently(day, [(COURT, "18:00", student) for student in students])
+
+    assert all(result["success"] for result in results)
+    assert sorted(_players_on_disk(day)) == students
+    assert max(result["version"] for result in results) == len(students)
+
+
+def test_overlapping_joins_in_one_batch_see_each_other(make_store, day, monkeypatch):
+    monkeypatch.setattr(utilities, "PREVENT_DOUBLE_BOOKING", True)
+    make_store(max_delay_ms=50)
+
+    courts = list(utilities.load_daily_reservations(day).root)
+    results = _join_concurrently(day, [(court, "18:00", "4000000") for court in courts])
+
+    assert sum(result["success"] for result in results) == 1
+    assert len(utilities.list_student_reservations("4000000", day, 1)) == 1
+    assert not utilities.add_player_to_timeslot(day, COURT, "18:30", "4000000", None)["success"]
@@ -0,0 +1,129 @@
+"""Sequenced feed of room changes for incremental client sync."""
+
+from collections import OrderedDict
+from datetime import datetime
+import threading
+from typing import Callable, Iterable, Optional
+import uuid
+
+from .search_index import is_listed
+
+
+class ChangeFeed:
+    """
+    Number every saved room change and answer "what changed since seq N".
+
+    Only the latest change per room is kept: a newer change moves the room to
+    the end of the feed and drops its older one, so the feed never holds more
+    than one change per room. Beyond `max_rooms` the oldest changes are
+    compacted away; a client asking for changes before that point gets a
+    reset and must refetch everything.
+
+    Sequences restart with the process. The feed's random `epoch` changes
+    with it, so clients can tell their cursor belongs to an older server.
+
+    Sequences are also local to one process: only changes saved here are
+    numbered. When a `fingerprint` is given, `sync` notices day files
+    rewritten by another worker process and resets every older cursor, so
+    those clients refetch instead of silently missing the change.
+
+    Args:
+        max_rooms: Most rooms to keep changes for before compacting
+        fingerprint: Identify a day file's version on disk
+    """
+
+    def __init__(self, max_rooms: int = 5000, fingerprint: Optional[Callable[[datetime], object]] = None) -> None:
+        self.max_rooms = max_rooms
+        self.epoch = uuid.uuid4().hex[:8]
+        self._fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._changes: OrderedDict[str, tuple[int, dict]] = OrderedDict()  # room id -> (seq, latest entry)
+        self._seq = 0
+        self._compacted_seq = 0  # changes up to here may have been dropped
+        self._fingerprints: dict[str, object] = {}  # date -> day file version after our latest change
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change."""
+        with self._lock:
+            return self._seq
+
+    def record(self, change: dict) -> int:
+        """
+        Append a saved timeslot change (reservation listener payload).
+
+        Returns:
+            The change's sequence number
+        """
+        entry = change["entry"]
+        fingerprint = self._fingerprint(datetime.strptime(entry["date"], "%Y-%m-%d")) if self._fingerprint else None
+        with self._lock:
+            self._seq += 1
+            self._changes.pop(entry["id"], None)
+            self._changes[entry["id"]] = (self._seq, entry)
+            if self._fingerprint:
+                self._fingerprints[entry["date"]] = fingerprint
+            while len(self._changes) > self.max_rooms:
+                _, (dropped_seq, _) = self._changes.popitem(last=False)
+                self._compacted_seq = dropped_seq
+            return self._seq
+
+    def sync(self, dates: Iterable[str]) -> bool:
+        """
+        Check day files for changes saved by another process.
+
+        A date seen for the first time is only remembered. A date whose
+        file no longer matches the version left by our latest change was
+        rewritten elsewhere: the feed then starts a new sequence and answers
+        every older cursor with a reset. A local change caught between its
+        save and its `record` looks the same; it costs a refetch, never a
+        missed change.
+
+        Args:
+            dates: Dates (YYYY-MM-DD) the caller is about to serve
+
+        Returns:
+            True if any day changed behind the feed's back
+        """
+        if not self._fingerprint:
+            return False
+        current = {date: self._fingerprint(datetime.strptime(date, "%Y-%m-%d")) for date in dates}
+        with self._lock:
+            changed = False
+            for date, fingerprint in current.items():
+                known = self._fingerprints.get(date, fingerprint)
+                self._fingerprints[date] = fingerprint
+                changed = changed or known != fingerprint
+            if changed:
+                self._seq += 1
+                self._compacted_seq = self._seq
+            return changed
+
+    def since(self, seq: int, epoch: Optional[str] = None) -> dict:
+        """
+        Collect the latest state of every room changed after seq.
+
+        Args:
+            seq: Last sequence number the client has applied
+            epoch: Epoch the client's seq came from, if known
+
+        Returns:
+            Dictionary with "seq" (cursor for the next call), "epoch",
+            "reset" (True when the client must refetch everything),
+            "rooms" (summaries of rooms created or updated, oldest first)
+            and "removed" (ids of rooms that were cleared)
+        """
+        with self._lock:
+            current = self._seq
+            reset = (epoch is not None and epoch != self.epoch) or seq < self._compacted_seq or seq > current
+            changed = []
+            if not reset:
+                for room_seq, entry in reversed(self._changes.values()):
+                    if room_seq <= seq:
+                        break
+                    changed.append(entry)
+                changed.reverse()
+
+        rooms = [entry for entry in changed if is_listed(entry)]
+        removed = [entry["id"] for entry in changed if not is_listed(entry)]
+        return {"seq": current, "epoch": self.epoch, "reset": reset, "rooms": rooms, "removed": removed}
@@ -0,0 +1,156 @@
+"""Court closures: cancel every booking of a court over a date and time range.
+
+Each affected day is cleared in a single batched write (see
+clear_timeslots), and results are yielded day by day so callers can stream
+the affected participants to a notifier while later days are processed.
+
+    python -m backend.utils.closures "Papp Stadium* ∆" 2025-11-01 2025-11-03 --start 08:00 --end 14:00
+
+The CLI writes the day files directly; while the server is running, use
+POST /api/admin/closures instead so its caches and indexes see the change.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import json
+import queue
+import threading
+from typing import Iterator
+
+from . import utilities
+
+MAX_CLOSURE_DAYS = 366
+
+
+def close_court(
+    court_name: str,
+    start_date: datetime,
+    end_date: datetime,
+    start_time: str = "00:00",
+    end_time: str = "24:00",
+) -> Iterator[dict]:
+    """
+    Clear every booked slot of a court between two dates (inclusive).
+
+    Only days that already have a reservation file are touched; days not
+    provisioned yet have nothing to cancel. Each day, every room overlapping
+    the time range is cancelled, including rooms that start before
+    start_time and run into it (see clear_timeslots).
+
+    Args:
+        court_name: Name of the court
+        start_date: First day of the closure
+        end_date: Last day of the closure
+        start_time: Start of the daily range (HH:MM, inclusive)
+        end_time: End of the daily range (HH:MM, exclusive; "24:00" = end of day)
+
+    Yields:
+        One dict per cleared slot (id, date, court, time, removed_players,
+        removed_waitlist), a {"date", "error"} dict for each day that failed,
+        and finally {"summary": {...}} with the totals
+    """
+    days = cleared = 0
+    participants: set[str] = set()
+    failed = []
+    first, last = start_date.date(), end_date.date()
+    for file_date in utilities.list_reservation_dates():
+        if not first <= file_date.date() <= last:
+            continue
+        result = utilities.clear_timeslots(file_date, court_name, start_time, end_time)
+        days += 1
+        if not result["success"]:
+            failed.append(file_date.strftime("%Y-%m-%d"))
+            yield {"date": file_date.strftime("%Y-%m-%d"), "error": result["message"]}
+            continue
+        for slot in result["cleared"]:
+            cleared += 1
+            participants.update(slot["removed_players"])
+            participants.update(slot["removed_waitlist"])
+            yield slot
+
+    yield {
+        "summary": {
+            "court": court_name,
+            "start_date": first.strftime("%Y-%m-%d"),
+            "end_date": last.strftime("%Y-%m-%d"),
+            "start_time": start_time,
+            "end_time": end_time,
+            "days": days,
+            "cleared_slots": cleared,
+            "affected_participants": len(participants),
+            "failed_dates": failed,
+        }
+    }
+
+
+def close_court_in_background(
+    court_name: str,
+    start_date: datetime,
+    end_date: datetime,
+    start_time: str = "00:00",
+    end_time: str = "24:00",
+) -> Iterator[dict]:
+    """
+    Run close_court to completion in a worker thread and yield its records.
+
+    The closure no longer depends on the consumer: a client that stops
+    reading (dropped connection, proxy timeout) leaves the remaining days
+    to be cleared anyway, and only the streamed output is lost.
+
+    Yields:
+        The records of close_court, as each day commits
+    """
+    records: queue.Queue = queue.Queue()
+    done = object()
+
+    def run() -> None:
+        try:
+            for record in close_court(court_name, start_date, end_date, start_time, end_time):
+                records.put(record)
+        except Exception as e:
+            print(f"Error closing {court_name}: {e}")
+            records.put({"error": f"Closure stopped: {e}"})
+        finally:
+            records.put(done)
+
+    threading.Thread(target=run, name="court-closure").start()
+    while True:
+        record = records.get()
+        if record is done:
+            return
+        yield record
+
+
+def validate_closure(start_date: datetime, end_date: datetime, start_time: str, end_time: str) -> str | None:
+    """Return an error message for an invalid closure range, or None."""
+    if end_date < start_date:
+        return "end_date must not be before start_date"
+    if (end_date - start_date) >= timedelta(days=MAX_CLOSURE_DAYS):
+        return f"A closure can span at most {MAX_CLOSURE_DAYS} days"
+    try:
+        start_minutes = utilities.time_to_minutes(start_time)
+        end_minutes = utilities.time_to_minutes(end_time)
+    except ValueError:
+        return "Times must be in HH:MM format"
+    if end_minutes <= start_minutes:
+        return "end_time must be after start_time"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cancel every booking of a court over a date and time range.")
+    parser.add_argument("court", help="court name, e.g. 'Papp Stadium* ∆'")
+    parser.add_argument("start_date", help="first day (YYYY-MM-DD)")
+    parser.add_argument("end_date", help="last day (YYYY-MM-DD), inclusive")
+    parser.add_argument("--start", default="00:00", help="start of the daily range (HH:MM); rooms running into it are cancelled too")
+    parser.add_argument("--end", default="24:00", help="end of the daily range (HH:MM, exclusive)")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start_date, "%Y-%m-%d")
+    end = datetime.strptime(args.end_date, "%Y-%m-%d")
+    error = validate_closure(start, end, args.start, args.end)
+    if error:
+        parser.error(error)
+    # One JSON object per line, so the output can be piped to a notifier.
+    for record in close_court(args.court, start, end, args.start, args.end):
+        print(json.dumps(record, ensure_ascii=False), flush=True)
@@ -0,0 +1,281 @@
+"""Encodings for storage files, detected automatically on read.
+
+Day files can be written as:
+
+- "json": indented JSON (the original format)
+- "compact": JSON without whitespace
+- "gzip": compact JSON, gzip-compressed (stdlib)
+- "zstd": compact JSON, Zstandard-compressed; needs compression.zstd
+  (Python 3.14+) or the zstandard package, and falls back to gzip otherwise
+- "binary": a struct-packed, MessagePack-like encoding that stores each
+  distinct string (keys included) once
+
+Readers never need to know the format: compressed and binary payloads
+start with a magic number, anything else is parsed as JSON. File names
+keep their .json suffix so every format can be mixed in one directory.
+
+Convert existing files with:
+
+    python -m backend.utils.file_codecs convert --to compact
+"""
+
+import gzip
+import json
+import struct
+import sys
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+BINARY_MAGIC = b"RSVB\x01"
+
+ENCODINGS = ("json", "compact", "gzip", "zstd", "binary")
+
+
+def resolve_encoding(name: str) -> str:
+    """Return the encoding to write for a configured name (zstd may fall back to gzip)."""
+    name = (name or "json").lower()
+    if name not in ENCODINGS:
+        raise ValueError(f"Unknown storage encoding '{name}'; expected one of {', '.join(ENCODINGS)}")
+    if name == "zstd" and _zstd is None:
+        return "gzip"
+    return name
+
+
+def encode(data: object, encoding: str = "json") -> bytes:
+    """
+    Serialize data in the given encoding.
+
+    Args:
+        data: JSON-compatible data
+        encoding: One of ENCODINGS
+
+    Returns:
+        Encoded bytes
+    """
+    encoding = resolve_encoding(encoding)
+    if encoding == "json":
+        return json.dumps(data, indent=2).encode("utf-8")
+    if encoding == "binary":
+        return _BinaryEncoder().encode(data)
+    compact = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    if encoding == "gzip":
+        # mtime=0 keeps output deterministic for identical data.
+        return gzip.compress(compact, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        return _zstd.compress(compact)
+    return compact
+
+
+def detect_encoding(raw: bytes) -> str:
+    """Name the encoding of a stored payload from its leading bytes."""
+    if raw.startswith(GZIP_MAGIC):
+        return "gzip"
+    if raw.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if raw.startswith(BINARY_MAGIC):
+        return "binary"
+    return "json"
+
+
+def decode(raw: bytes) -> object:
+    """
+    Parse a stored payload in any supported encoding.
+
+    Raises:
+        ValueError: If the payload is zstd-compressed and no zstd module is available
+    """
+    encoding = detect_encoding(raw)
+    if encoding == "gzip":
+        return json.loads(gzip.decompress(raw))
+    if encoding == "zstd":
+        if _zstd is None:
+            raise ValueError("File is zstd-compressed but no zstd module is installed")
+        return json.loads(_zstd.decompress(raw))
+    if encoding == "binary":
+        return _decode_binary(raw)
+    return json.loads(raw)
+
+
+# --- Binary encoding ---
+#
+# Every value starts with a one-byte tag. Integers and lengths are unsigned
+# LEB128 varints (signed ints are zigzag-encoded). A string's first
+# occurrence is stored inline and numbered; repeats refer to that number.
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _STR_REF, _LIST, _DICT = range(9)
+_FLOAT_STRUCT = struct.Struct("<d")
+
+
+class _BinaryEncoder:
+    def __init__(self) -> None:
+        self._out = bytearray(BINARY_MAGIC)
+        self._strings: dict[str, int] = {}
+
+    def encode(self, data: object) -> bytes:
+        self._value(data)
+        return bytes(self._out)
+
+    def _varint(self, number: int) -> None:
+        out = self._out
+        while number >= 0x80:
+            out.append((number & 0x7F) | 0x80)
+            number >>= 7
+        out.append(number)
+
+    def _value(self, value: object) -> None:
+        out = self._out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int):
+            out.append(_INT)
+            self._varint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _FLOAT_STRUCT.pack(value)
+        elif isinstance(value, str):
+            self._string(value)
+        elif isinstance(value, (list, tuple)):
+            out.append(_LIST)
+            self._varint(len(value))
+            for item in value:
+                self._value(item)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            self._varint(len(value))
+            for key, item in value.items():
+                self._string(str(key))
+                self._value(item)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__} in binary storage format")
+
+    def _string(self, value: str) -> None:
+        index = self._strings.get(value)
+        if index is not None:
+            self._out.append(_STR_REF)
+            self._varint(index)
+            return
+        self._strings[value] = len(self._strings)
+        encoded = value.encode("utf-8")
+        self._out.append(_STR)
+        self._varint(len(encoded))
+        self._out += encoded
+
+
+def _decode_binary(raw: bytes) -> object:
+    pos = len(BINARY_MAGIC)
+    strings: list[str] = []
+
+    def varint() -> int:
+        nonlocal pos
+        byte = raw[pos]
+        pos += 1
+        if byte < 0x80:
+            return byte
+        number = byte & 0x7F
+        shift = 7
+        while True:
+            byte = raw[pos]
+            pos += 1
+            number |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    def value() -> object:
+        nonlocal pos
+        tag = raw[pos]
+        pos += 1
+        if tag == _STR_REF:
+            return strings[varint()]
+        if tag == _STR:
+            length = varint()
+            text = raw[pos:pos + length].decode("utf-8")
+            pos += length
+            strings.append(text)
+            return text
+        if tag == _DICT:
+            result = {}
+            for _ in range(varint()):
+                key = value()
+                result[key] = value()
+            return result
+        if tag == _LIST:
+            return [value() for _ in range(varint())]
+        if tag == _INT:
+            number = varint()
+            return -((number + 1) >> 1) if number & 1 else number >> 1
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _FLOAT:
+            (number,) = _FLOAT_STRUCT.unpack_from(raw, pos)
+            pos += _FLOAT_STRUCT.size
+            return number
+        raise ValueError(f"Unknown tag {tag} in binary storage payload")
+
+    result = value()
+    if pos != len(raw):
+        raise ValueError("Trailing bytes after binary storage payload")
+    return result
+
+
+def convert_day_files(encoding: str) -> dict:
+    """
+    Rewrite every day file on disk in the given encoding.
+
+    Each file is converted through the group-commit store, so it never
+    races a mutation in this process.
+
+    Returns:
+        Dictionary with counts of converted and unchanged files, and bytes before/after
+    """
+    from . import utilities
+
+    encoding = resolve_encoding(encoding)
+    converted = unchanged = before = after = 0
+    for file_date in utilities.list_reservation_dates():
+        filepath = utilities.get_reservation_filepath(file_date)
+        with utilities.day_store.transaction(file_date):
+            raw = filepath.read_bytes()
+            before += len(raw)
+            if _stored_encoding(raw) == encoding:
+                unchanged += 1
+                after += len(raw)
+                continue
+            utilities.write_storage_file(filepath, decode(raw), encoding)
+            after += filepath.stat().st_size
+            converted += 1
+    return {"converted": converted, "unchanged": unchanged, "bytes_before": before, "bytes_after": after}
+
+
+def _stored_encoding(raw: bytes) -> str:
+    encoding = detect_encoding(raw)
+    if encoding == "json" and b"\n" not in raw.strip():
+        return "compact"
+    return encoding
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "convert" and sys.argv[2] == "--to":
+        result = convert_day_files(sys.argv[3])
+        print(
+            f"Converted {result['converted']} day files ({result['unchanged']} already in that format): "
+            f"{result['bytes_before']} -> {result['bytes_after']} bytes"
+        )
+    else:
+        print(f"Usage: python -m backend.utils.file_codecs convert --to [{'|'.join(ENCODINGS)}]")
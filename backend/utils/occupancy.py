@@ -0,0 +1,243 @@
+"""Per-day occupancy arrays and capacity-aware slot recommendations."""
+
+from array import array
+from datetime import datetime, timedelta
+import heapq
+import threading
+from typing import Callable, Optional
+
+from .timeline_index import DEFAULT_DURATION_MIN, slot_interval
+
+# Slot states in _CourtRow.state
+SLOT_CLOSED = 0  # private, full, or otherwise not bookable
+SLOT_OPEN = 1  # nobody has booked it: the student would create the room
+SLOT_JOINABLE = 2  # public room with spots left
+
+# Weights of the recommendation score components (each in 0..1)
+CAPACITY_WEIGHT = 0.4
+PROXIMITY_WEIGHT = 0.4
+FIT_WEIGHT = 0.2
+
+# Requested-time distance at which the proximity score bottoms out
+PROXIMITY_HORIZON_MIN = 360
+
+# Gap to another of the student's bookings that counts as a tight turnaround
+TURNAROUND_MIN = 60
+
+# Largest duration a _CourtRow can hold (unsigned 16-bit array)
+MAX_DURATION_MIN = 0xFFFF
+
+
+def _minutes(time_str: str) -> int:
+    hours, minutes = time_str.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _slot_state(owner_id, participants: int, privacy: str, capacity: int) -> int:
+    if not owner_id and not participants:
+        return SLOT_OPEN
+    if privacy == "public" and participants < capacity:
+        return SLOT_JOINABLE
+    return SLOT_CLOSED
+
+
+class _CourtRow:
+    """One court's slots on one day as parallel arrays."""
+
+    __slots__ = ("name", "type", "capacity", "times", "index", "minutes", "state", "count", "duration")
+
+    def __init__(self, name: str, court_type: str, capacity: int, times: list[str]) -> None:
+        self.name = name
+        self.type = court_type
+        self.capacity = capacity
+        self.times = times
+        self.index = {time_str: position for position, time_str in enumerate(times)}
+        self.minutes = array("H", (_minutes(time_str) for time_str in times))
+        self.state = bytearray(len(times))
+        self.count = array("H", bytes(2 * len(times)))
+        self.duration = array("H", bytes(2 * len(times)))
+
+    def set(self, position: int, owner_id, participants: int, privacy: str, duration_min: Optional[int]) -> None:
+        self.state[position] = _slot_state(owner_id, participants, privacy, self.capacity)
+        self.count[position] = participants
+        # Stored durations predate validation, so clamp to the array's range.
+        self.duration[position] = min(max(duration_min or DEFAULT_DURATION_MIN, 1), MAX_DURATION_MIN)
+
+
+class _DayOccupancy:
+    def __init__(self, fingerprint) -> None:
+        self.fingerprint = fingerprint
+        self.courts: dict[str, _CourtRow] = {}
+        self.by_type: dict[str, list[_CourtRow]] = {}
+
+
+class OccupancyIndex:
+    """
+    Occupancy of every court and timeslot per day, kept in compact arrays.
+
+    A day is built once from its DailyReservations and then kept current by
+    the reservation listener hook, so ranking slots never walks models. A day
+    file changed by another process is noticed by its fingerprint and
+    rebuilt.
+
+    Args:
+        load: Return a date's DailyReservations (provisioning it if needed)
+        fingerprint: Identify the day file's version on disk
+    """
+
+    def __init__(self, load: Callable[[datetime], object], fingerprint: Callable[[datetime], object]) -> None:
+        self._load = load
+        self._fingerprint = fingerprint
+        self._lock = threading.RLock()
+        self._days: dict[str, _DayOccupancy] = {}
+
+    def _build(self, date: datetime) -> Optional[_DayOccupancy]:
+        reservations = self._load(date)
+        if not reservations:
+            return None
+        day = _DayOccupancy(self._fingerprint(date))
+        for court_name, court in reservations.root.items():
+            row = _CourtRow(court_name, court.type.value.lower(), court.capacity, list(court.timeslots))
+            for position, slot in enumerate(court.timeslots.values()):
+                row.set(position, slot.owner_id, len(slot.players_id), slot.type, slot.duration_min)
+            day.courts[court_name] = row
+            day.by_type.setdefault(row.type, []).append(row)
+        return day
+
+    def _day(self, date: datetime) -> Optional[_DayOccupancy]:
+        date_str = date.strftime("%Y-%m-%d")
+        day = self._days.get(date_str)
+        if day is None or day.fingerprint != self._fingerprint(date):
+            day = self._build(date)
+            if day is None:
+                self._days.pop(date_str, None)
+                return None
+            self._days[date_str] = day
+        return day
+
+    def record_change(self, change: dict) -> None:
+        """Reservation listener: apply a saved slot change to its day's arrays."""
+        entry = change["entry"]
+        with self._lock:
+            day = self._days.get(entry["date"])
+            row = day.courts.get(entry["court"]) if day else None
+            if row is None or entry["time"] not in row.index:
+                return
+            row.set(
+                row.index[entry["time"]],
+                entry.get("owner_id"),
+                len(entry.get("participants", [])),
+                entry.get("privacy", "public"),
+                entry.get("duration_min"),
+            )
+            day.fingerprint = self._fingerprint(datetime.strptime(entry["date"], "%Y-%m-%d"))
+
+    def recommend(
+        self,
+        sport: str,
+        start_date: datetime,
+        days: int,
+        bookings: list[dict] = (),
+        preferred_time: Optional[str] = None,
+        duration_min: int = DEFAULT_DURATION_MIN,
+        limit: int = 10,
+        now: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Rank open and joinable slots of a sport type.
+
+        Each slot scores by the share of its capacity still free, how close
+        it starts to preferred_time, and how it fits the student's other
+        bookings: overlapping slots are skipped and slots within an hour of
+        another booking score lower.
+
+        Args:
+            sport: Court type (e.g. "basketball", case-insensitive)
+            start_date: First day to consider
+            days: Number of days to consider
+            bookings: The student's reservation summaries (see StudentTimelineIndex)
+            preferred_time: Desired start time (HH:MM); None ignores time of day
+            duration_min: Length of a room the student would create in an open slot
+            limit: Maximum number of recommendations
+            now: Slots starting before this are skipped (defaults to now)
+
+        Returns:
+            Recommendations ordered by score, best first
+        """
+        now = now or datetime.now()
+        sport = sport.lower()
+        target = _minutes(preferred_time) if preferred_time else None
+
+        busy: dict[str, list[tuple[int, int]]] = {}
+        for entry in bookings:
+            start, end = slot_interval(entry)
+            day_start = datetime.strptime(entry["date"], "%Y-%m-%d")
+            busy.setdefault(entry["date"], []).append((
+                int((start - day_start).total_seconds() // 60),
+                int((end - day_start).total_seconds() // 60),
+            ))
+
+        candidates = []
+        with self._lock:
+            first_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            for stale in [key for key in self._days if key < first_day.strftime("%Y-%m-%d")]:
+                del self._days[stale]
+
+            for offset in range(days):
+                date = first_day + timedelta(days=offset)
+                if date.date() < now.date():
+                    continue
+                date_str = date.strftime("%Y-%m-%d")
+                day = self._day(date)
+                if day is None:
+                    continue
+                earliest = (now.hour * 60 + now.minute) if date.date() == now.date() else -1
+                day_busy = busy.get(date_str, ())
+
+                for row in day.by_type.get(sport, ()):
+                    state, count, minutes, durations = row.state, row.count, row.minutes, row.duration
+                    capacity = row.capacity
+                    for position in range(len(state)):
+                        slot_state = state[position]
+                        if not slot_state:
+                            continue
+                        start = minutes[position]
+                        if start < earliest:
+                            continue
+                        end = start + (duration_min if slot_state == SLOT_OPEN else durations[position])
+
+                        fit = 1.0
+                        for busy_start, busy_end in day_busy:
+                            if busy_start < end and start < busy_end:
+                                fit = -1.0
+                                break
+                            if busy_start - TURNAROUND_MIN < end and start < busy_end + TURNAROUND_MIN:
+                                fit = 0.5
+                        if fit < 0:
+                            continue
+
+                        remaining = capacity - count[position]
+                        proximity = 1.0
+                        if target is not None:
+                            proximity = 1 - min(abs(start - target), PROXIMITY_HORIZON_MIN) / PROXIMITY_HORIZON_MIN
+                        score = CAPACITY_WEIGHT * remaining / capacity + PROXIMITY_WEIGHT * proximity + FIT_WEIGHT * fit
+                        # Ties go to the earlier slot.
+                        candidates.append((score, -offset, -start, row, position, date_str))
+
+            best = heapq.nlargest(limit, candidates, key=lambda candidate: candidate[:3])
+            return [
+                {
+                    "id": f"{date_str}|{row.name}|{row.times[position]}",
+                    "date": date_str,
+                    "time": row.times[position],
+                    "court": row.name,
+                    "court_type": row.type,
+                    "capacity": row.capacity,
+                    "participants": row.count[position],
+                    "remaining": row.capacity - row.count[position],
+                    "kind": "create" if row.state[position] == SLOT_OPEN else "join",
+                    "duration_min": duration_min if row.state[position] == SLOT_OPEN else row.duration[position],
+                    "score": round(score, 4),
+                }
+                for score, _, _, row, position, date_str in best
+            ]
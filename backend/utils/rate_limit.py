@@ -0,0 +1,120 @@
+"""Token-bucket rate limiting and load shedding for mutation endpoints."""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: each key may burst up to `burst` requests and then
+    refills at `rate_per_second`.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int = 10000) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    def acquire(self, key: str) -> tuple[bool, float]:
+        """
+        Take one token for key.
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        if self.rate_per_second <= 0:
+            return True, 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate_per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / self.rate_per_second
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float) -> None:
+        # Buckets idle long enough to be full again carry no state.
+        refill_seconds = self.burst / self.rate_per_second
+        for key in [k for k, (_, updated_at) in self._buckets.items() if now - updated_at >= refill_seconds]:
+            del self._buckets[key]
+
+
+class LoadShedder:
+    """
+    Reject work when too many writes are in flight or recent writes are slow.
+
+    Write latency is tracked as an exponentially weighted moving average. It
+    stops counting once no write has finished for `recovery_seconds`, so a
+    shed period cannot keep itself going.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_latency_ms: float,
+        smoothing: float = 0.2,
+        recovery_seconds: float = 1.0,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_latency_ms = max_latency_ms
+        self.smoothing = smoothing
+        self.recovery_seconds = recovery_seconds
+        self._lock = threading.Lock()
+        self._last_sample_at = 0.0
+        self.in_flight = 0
+        self.latency_ms = 0.0
+
+    def _overloaded(self) -> bool:
+        # Caller holds self._lock.
+        if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+            return True
+        if time.monotonic() - self._last_sample_at > self.recovery_seconds:
+            self.latency_ms = 0.0
+        return self.max_latency_ms > 0 and self.latency_ms > self.max_latency_ms
+
+    def overloaded(self) -> bool:
+        """Whether new writes would be shed right now."""
+        with self._lock:
+            return self._overloaded()
+
+    def try_enter(self) -> bool:
+        """
+        Admit a write unless overloaded, counting it as in flight.
+
+        The check and the count happen under one lock, so concurrent callers
+        can never push in_flight past max_in_flight. Every admitted write
+        must be paired with `leave`.
+
+        Returns:
+            True if the write was admitted
+        """
+        with self._lock:
+            if self._overloaded():
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self, started: Optional[float] = None) -> None:
+        """
+        Finish an admitted write.
+
+        Args:
+            started: time.monotonic() when the write began, to record its
+                latency; None if it never ran (e.g. it was rate limited)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if started is not None:
+                self.latency_ms += self.smoothing * ((now - started) * 1000 - self.latency_ms)
+                self._last_sample_at = now
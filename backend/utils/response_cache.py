@@ -0,0 +1,116 @@
+"""Short-lived response cache with in-flight request coalescing."""
+
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+
+class _Pending:
+    """A computation that concurrent callers can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Cache computed responses for a short TTL.
+
+    Concurrent misses for the same key share one computation: the first caller
+    runs it and the others block until the result is ready. Entries can be
+    tagged (e.g. with the dates they were built from) so that writes only
+    invalidate what they touched.
+
+    Keys include client-supplied values, so expired entries are swept once
+    per TTL and at most `max_entries` are kept (the oldest go first).
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0, max_entries: int = 1000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, tuple[float, Any, frozenset]] = {}  # oldest first
+        self._pending: dict[Hashable, _Pending] = {}
+        self._generation = 0
+        self._next_sweep = 0.0
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Return the cached value for key, computing it at most once on a miss.
+
+        Args:
+            key: Hashable cache key (endpoint plus normalized query args)
+            compute: Zero-argument callable producing the value
+            tags: Tags used by invalidate() to drop this entry
+
+        Returns:
+            The cached or freshly computed value
+        """
+        if self.ttl_seconds <= 0:
+            return compute()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            pending = self._pending.get(key)
+            is_leader = pending is None
+            if is_leader:
+                pending = _Pending()
+                self._pending[key] = pending
+                generation = self._generation
+
+        if not is_leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = compute()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+                # Don't store a value computed while a write invalidated it.
+                if pending.error is None and generation == self._generation:
+                    now = time.monotonic()
+                    self._entries.pop(key, None)
+                    self._entries[key] = (now + self.ttl_seconds, pending.value, frozenset(tags))
+                    if now >= self._next_sweep or len(self._entries) > self.max_entries:
+                        self._prune(now)
+            pending.done.set()
+        return pending.value
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        # Entries share one TTL, so insertion order is expiry order.
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._next_sweep = now + self.ttl_seconds
+
+    def invalidate(self, tag: str | None = None) -> None:
+        """
+        Drop cached entries.
+
+        Args:
+            tag: Only drop entries carrying this tag; drop everything if None
+        """
+        with self._lock:
+            self._generation += 1
+            if tag is None:
+                self._entries.clear()
+                return
+            stale = [key for key, (_, _, tags) in self._entries.items() if tag in tags]
+            for key in stale:
+                del self._entries[key]
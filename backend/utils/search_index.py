@@ -0,0 +1,193 @@
+"""In-process inverted index for room search with prefix matching and facets."""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+import re
+import threading
+from typing import Optional
+
+from . import utilities
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+SEARCH_FIELDS = ("room_name", "reservation_name", "activity_label", "court")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase text and split it into alphanumeric tokens."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def is_listed(entry: Optional[dict]) -> bool:
+    """Whether a reservation summary describes a room (same rule as list_reservations_between)."""
+    return bool(entry) and bool(entry.get("owner_id") or entry.get("room_name") or entry.get("participants"))
+
+
+class RoomSearchIndex:
+    """
+    Map tokens of room_name, reservation_name, activity label and court to rooms.
+
+    The vocabulary is kept sorted so a prefix query is a bisect plus a short
+    scan. Every query token must match (AND); each may match as a prefix.
+    Each indexed day remembers the fingerprint of the day file it was read
+    from, so days changed by another process can be re-indexed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._docs: dict[str, dict] = {}
+        self._doc_tokens: dict[str, set[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._vocabulary: list[str] = []
+        self._fingerprints: dict[str, object] = {}
+
+    def update(self, slot_id: str, entry: Optional[dict]) -> None:
+        """
+        Replace the indexed state of one room.
+
+        Args:
+            slot_id: Room id ("YYYY-MM-DD|court|HH:MM")
+            entry: Current reservation summary; unlisted or None removes it
+        """
+        with self._lock:
+            for token in self._doc_tokens.pop(slot_id, set()):
+                postings = self._postings[token]
+                postings.discard(slot_id)
+                if not postings:
+                    del self._postings[token]
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+            self._docs.pop(slot_id, None)
+            if not is_listed(entry):
+                return
+
+            tokens = {token for field in SEARCH_FIELDS for token in tokenize(entry.get(field))}
+            self._docs[slot_id] = entry
+            self._doc_tokens[slot_id] = tokens
+            for token in tokens:
+                if token not in self._postings:
+                    self._postings[token] = set()
+                    insort(self._vocabulary, token)
+                self._postings[token].add(slot_id)
+
+    def replace_date(self, date_str: str, entries: list[dict], fingerprint: object) -> None:
+        """
+        Replace every room of one date, as read from a day file.
+
+        Args:
+            date_str: Date (YYYY-MM-DD)
+            entries: The day's reservation summaries
+            fingerprint: Version of the day file the entries were read from
+        """
+        with self._lock:
+            self.drop_date(date_str)
+            for entry in entries:
+                self.update(entry["id"], entry)
+            self._fingerprints[date_str] = fingerprint
+
+    def drop_date(self, date_str: str) -> None:
+        """Forget every room on the given date (YYYY-MM-DD)."""
+        with self._lock:
+            prefix = f"{date_str}|"
+            for slot_id in [sid for sid in self._docs if sid.startswith(prefix)]:
+                self.update(slot_id, None)
+            self._fingerprints.pop(date_str, None)
+
+    def fingerprint(self, date_str: str) -> object:
+        """Return the day file version a date was indexed from, or None if it wasn't."""
+        with self._lock:
+            return self._fingerprints.get(date_str)
+
+    def touch(self, date_str: str, fingerprint: object) -> None:
+        """Record the day file version after this process wrote a change it already applied."""
+        with self._lock:
+            if date_str in self._fingerprints:
+                self._fingerprints[date_str] = fingerprint
+
+    def indexed_dates(self) -> list[str]:
+        """Return the dates indexed from day files."""
+        with self._lock:
+            return list(self._fingerprints)
+
+    def _match_prefix(self, prefix: str) -> set[str]:
+        matches: set[str] = set()
+        index = bisect_left(self._vocabulary, prefix)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            matches |= self._postings[self._vocabulary[index]]
+            index += 1
+        return matches
+
+    def search(
+        self,
+        query: str = "",
+        sport: str | None = None,
+        date: str | None = None,
+        date_from: str | None = None,
+        limit: int = 50,
+    ) -> dict:
+        """
+        Find rooms matching every query token (as a prefix).
+
+        Facet counts by sport type and date cover all rooms matching the
+        query; the sport and date filters then narrow the returned results.
+
+        Args:
+            query: Free text; empty matches every room
+            sport: Only return rooms of this court type (case-insensitive)
+            date: Only return rooms on this date (YYYY-MM-DD)
+            date_from: Ignore rooms before this date (YYYY-MM-DD)
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with "results" (summaries ordered by date and time),
+            "total" and "facets" ({"type": {...}, "date": {...}})
+        """
+        with self._lock:
+            matched: Optional[set[str]] = None
+            for token in tokenize(query):
+                hits = self._match_prefix(token)
+                matched = hits if matched is None else matched & hits
+                if not matched:
+                    break
+            if matched is None:
+                matched = set(self._docs)
+            entries = [self._docs[slot_id] for slot_id in matched]
+
+        if date_from:
+            entries = [entry for entry in entries if entry["date"] >= date_from]
+        facets = {
+            "type": dict(Counter((entry.get("court_type") or "general").lower() for entry in entries)),
+            "date": dict(sorted(Counter(entry["date"] for entry in entries).items())),
+        }
+        if sport:
+            entries = [entry for entry in entries if (entry.get("court_type") or "").lower() == sport.lower()]
+        if date:
+            entries = [entry for entry in entries if entry["date"] == date]
+        entries.sort(key=lambda entry: (entry["date"], entry["time"], entry["court"]))
+        return {"results": entries[:limit], "total": len(entries), "facets": facets}
+
+
+def build_room_search_index(index: RoomSearchIndex) -> RoomSearchIndex:
+    """
+    Bring the index up to date with the day files on disk from today on.
+
+    Days that are new or whose file changed since they were indexed (e.g.
+    written by another worker process) are re-read; past days and days whose
+    file is gone are dropped.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    on_disk = set()
+    for file_date in utilities.list_reservation_dates():
+        date_str = file_date.strftime("%Y-%m-%d")
+        if date_str < today:
+            continue
+        on_disk.add(date_str)
+        # Fingerprint first: a write racing the read only causes a re-index.
+        fingerprint = utilities.reservation_fingerprint(file_date)
+        if fingerprint is None or index.fingerprint(date_str) == fingerprint:
+            continue
+        index.replace_date(date_str, utilities.list_reservations_between(file_date, 1), fingerprint)
+
+    for date_str in index.indexed_dates():
+        if date_str not in on_disk:
+            index.drop_date(date_str)
+    return index
@@ -0,0 +1,239 @@
+"""Recurring room series, stored once and materialized into day files."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import threading
+from typing import Literal, Optional
+import uuid
+
+from ..storage.storage_template import RoomSeries, RoomSeriesCollection
+from . import utilities
+from .file_codecs import decode
+
+MAX_OCCURRENCES = 52
+
+# Serializes load -> conflict check -> save of series.json in this process
+_series_lock = threading.Lock()
+
+
+def get_series_filepath() -> Path:
+    """Get the full path to the series definitions file."""
+    return utilities.STORAGE_DIR / "series.json"
+
+
+def load_series() -> RoomSeriesCollection:
+    """
+    Load all recurring room series.
+
+    Returns:
+        RoomSeriesCollection (empty if the file doesn't exist)
+
+    Raises:
+        ValueError: If the file exists but can't be read, so callers never
+            mistake a damaged file for "no series" and overwrite it
+    """
+    filepath = get_series_filepath()
+    if not filepath.exists():
+        return RoomSeriesCollection({})
+
+    try:
+        return RoomSeriesCollection.model_validate(decode(filepath.read_bytes()))
+    except Exception as e:
+        print(f"Error loading series: {e}")
+        raise ValueError(f"Unable to load series: {e}") from e
+
+
+def save_series(collection: RoomSeriesCollection) -> bool:
+    """
+    Save all recurring room series.
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        utilities.STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+        utilities.write_storage_file(get_series_filepath(), collection.model_dump())
+        return True
+    except Exception as e:
+        print(f"Error saving series: {e}")
+        return False
+
+
+def series_dates(series: RoomSeries) -> list[str]:
+    """Return the YYYY-MM-DD dates of every occurrence in the series."""
+    start = datetime.strptime(series.start_date, "%Y-%m-%d")
+    return [
+        (start + timedelta(days=series.interval_days * index)).strftime("%Y-%m-%d")
+        for index in range(series.occurrences)
+    ]
+
+
+def _claim_slot(slot, court, court_name: str, series: RoomSeries) -> None:
+    """Book an empty slot for the series owner, as a first join would."""
+    slot.players_id = [series.owner_id]
+    slot.owner_id = series.owner_id
+    slot.type = series.type
+    slot.room_name = series.room_name or series.reservation_name or f"{court_name} {series.time}"
+    slot.duration_min = series.duration_min
+    slot.reservation_name = series.reservation_name
+    slot.court_type = series.court_type
+    slot.access_code = series.access_code if series.type == "private" else None
+    utilities.sync_timeslot_status(slot, court.capacity)
+    slot.version += 1
+
+
+def materialize_series_into_day(date: datetime, reservations) -> None:
+    """
+    Day provisioner: book every series occurrence falling on a new day.
+
+    Runs before the day's first save, so a whole day of recurring rooms costs
+    a single write. Slots that are somehow already taken are left alone.
+    """
+    date_str = date.strftime("%Y-%m-%d")
+    for series in load_series().root.values():
+        if date_str in series.skipped_dates or date_str not in series_dates(series):
+            continue
+        court = reservations.root.get(series.court)
+        slot = court.timeslots.get(series.time) if court else None
+        if slot is None or slot.players_id:
+            continue
+        _claim_slot(slot, court, series.court, series)
+
+
+def create_room_series(
+    owner_id: str,
+    court_name: str,
+    time_str: str,
+    start_date: datetime,
+    occurrences: int,
+    interval_days: int = 7,
+    timeslot_type: Literal["private", "public"] = "public",
+    room_name: str | None = None,
+    duration_min: int | None = None,
+    access_code: str | None = None,
+    reservation_name: str = "",
+    court_type_label: str = "",
+    skip_conflicts: bool = False,
+    owner_name: Optional[str] = None,
+) -> dict:
+    """
+    Create a recurring room and book every occurrence on provisioned days.
+
+    Each affected day is committed once. Occurrences on days that don't
+    exist yet are booked when those days are provisioned.
+
+    Args:
+        owner_id: Student ID hosting the series (must be 7 digits)
+        court_name: Name of the court
+        time_str: Time in HH:MM format
+        start_date: Date of the first occurrence
+        occurrences: Number of occurrences (1-52)
+        interval_days: Days between occurrences (7 = weekly)
+        timeslot_type: "private" or "public"
+        skip_conflicts: Create the series without conflicting occurrences
+            instead of failing
+
+    Returns:
+        Dictionary with success status, series id, materialized room ids and
+        a conflict report covering the whole series
+    """
+    if timeslot_type not in ["private", "public"]:
+        return {"success": False, "message": "Timeslot type must be 'private' or 'public'"}
+    if not 1 <= occurrences <= MAX_OCCURRENCES:
+        return {"success": False, "message": f"Occurrences must be between 1 and {MAX_OCCURRENCES}"}
+    if interval_days < 1:
+        return {"success": False, "message": "Interval must be at least one day"}
+    if start_date.date() < datetime.now().date():
+        return {"success": False, "message": "A series cannot start in the past"}
+    try:
+        datetime.strptime(time_str, "%H:%M")
+    except ValueError:
+        return {"success": False, "message": "Time must be in HH:MM format"}
+
+    success, message, _ = utilities.get_or_register_user(owner_id, owner_name)
+    if not success:
+        return {"success": False, "message": message}
+
+    normalized_code = (access_code or "").strip().upper() or None
+    series = RoomSeries(
+        owner_id=owner_id,
+        court=court_name,
+        time=time_str,
+        start_date=start_date.strftime("%Y-%m-%d"),
+        interval_days=interval_days,
+        occurrences=occurrences,
+        type=timeslot_type,
+        room_name=room_name,
+        duration_min=duration_min,
+        access_code=(normalized_code or utilities.generate_access_code()) if timeslot_type == "private" else None,
+        reservation_name=reservation_name,
+        court_type=court_type_label,
+    )
+
+    with _series_lock:
+        try:
+            collection = load_series()
+        except ValueError as e:
+            return {"success": False, "message": str(e), "storage_error": True}
+        conflicts = []
+        provisioned = {}
+        for date_str in series_dates(series):
+            date_dt = datetime.strptime(date_str, "%Y-%m-%d")
+            reservations = utilities.load_daily_reservations(date_dt)
+            if reservations:
+                court = reservations.root.get(court_name)
+                if not court:
+                    return {"success": False, "message": f"Court '{court_name}' not found"}
+                slot = court.timeslots.get(time_str)
+                if not slot:
+                    return {"success": False, "message": f"Timeslot '{time_str}' not found"}
+                if slot.players_id:
+                    conflicts.append({"date": date_str, "reason": "Timeslot already booked", "owner_id": slot.owner_id})
+                    continue
+                provisioned[date_str] = date_dt
+                continue
+
+            for other_id, other in collection.root.items():
+                if other.court != court_name or other.time != time_str or date_str in other.skipped_dates:
+                    continue
+                if date_str in series_dates(other):
+                    conflicts.append({"date": date_str, "reason": f"Reserved by series {other_id}", "owner_id": other.owner_id})
+                    break
+
+        if conflicts and not skip_conflicts:
+            return {
+                "success": False,
+                "message": f"{len(conflicts)} of {occurrences} occurrences conflict with existing bookings",
+                "conflicts": conflicts,
+            }
+
+        series.skipped_dates = [conflict["date"] for conflict in conflicts]
+        series_id = uuid.uuid4().hex[:12]
+        collection.root[series_id] = series
+        if not save_series(collection):
+            return {"success": False, "message": "Error saving series", "storage_error": True}
+
+    materialized = []
+    for date_str, date_dt in provisioned.items():
+        with utilities.day_store.transaction(date_dt) as txn:
+            court = txn.reservations.root[court_name] if txn.reservations else None
+            slot = court.timeslots[time_str] if court else None
+            if slot is None or slot.players_id:
+                conflicts.append({"date": date_str, "reason": "Timeslot booked meanwhile", "owner_id": slot.owner_id if slot else None})
+                continue
+            _claim_slot(slot, court, court_name, series)
+            entry = utilities.summarize_timeslot(date_str, court_name, court, time_str, slot)
+            committed = txn.commit(lambda: utilities.publish_timeslot_change("join", entry, owner_id))
+        if committed:
+            materialized.append(entry["id"])
+        else:
+            conflicts.append({"date": date_str, "reason": "Error saving reservation", "owner_id": None})
+
+    return {
+        "success": True,
+        "message": f"Created series with {occurrences - len(series.skipped_dates)} of {occurrences} occurrences",
+        "series_id": series_id,
+        "series": series.model_dump(),
+        "materialized": materialized,
+        "conflicts": conflicts,
+    }
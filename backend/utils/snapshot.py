@@ -0,0 +1,158 @@
+"""Binary snapshots of the live reservation state for fast warm starts.
+
+A snapshot holds the parsed contents of every day file and users.json, each
+tagged with the (mtime_ns, size) it was read at, plus the student timeline
+index with the file version each of its days was indexed from. Restoring it
+takes one read; any file or timeline day that doesn't match the file on
+disk is reloaded from disk instead.
+
+Snapshots are pickled and must only be loaded from the server's own storage
+directory.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import os
+import pickle
+import sys
+import threading
+from typing import Optional
+
+from . import utilities
+
+SNAPSHOT_MAGIC = b"RSVSNAP1"
+SNAPSHOT_FILENAME = "snapshot.bin"
+
+
+def get_snapshot_filepath() -> Path:
+    """Get the full path to the snapshot file."""
+    return utilities.STORAGE_DIR / SNAPSHOT_FILENAME
+
+
+def write_snapshot(path: Optional[Path] = None) -> bool:
+    """
+    Dump the current reservation state to a snapshot file.
+
+    Args:
+        path: Destination file (defaults to storage/snapshot.bin)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    path = path or get_snapshot_filepath()
+    try:
+        # Loading every source file refreshes the parsed-file cache we dump.
+        utilities.load_users()
+        for file_date in utilities.list_reservation_dates():
+            utilities.load_daily_reservations(file_date)
+        # The timeline's own fingerprints say which file version its entries
+        # reflect; a write can land between this and the file cache copy.
+        timeline, timeline_fingerprints = utilities.ensure_student_timeline().export()
+
+        files = {}
+        for filepath, (mtime_ns, size, data) in utilities.cached_storage_files().items():
+            if filepath.exists():
+                files[str(filepath.relative_to(utilities.STORAGE_DIR))] = (mtime_ns, size, data)
+
+        payload = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "files": files,
+            "timeline": timeline,
+            "timeline_fingerprints": timeline_fingerprints,
+        }
+        tmp_path = utilities.temp_path_for(path)
+        try:
+            with tmp_path.open("xb") as f:
+                f.write(SNAPSHOT_MAGIC)
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return True
+    except Exception as e:
+        print(f"Error writing snapshot: {e}")
+        return False
+
+
+def restore_snapshot(path: Optional[Path] = None) -> dict:
+    """
+    Restore cached state from a snapshot, reloading files that changed since.
+
+    Args:
+        path: Snapshot file (defaults to storage/snapshot.bin)
+
+    Returns:
+        Dictionary with success status, counts of restored and reloaded files
+    """
+    path = path or get_snapshot_filepath()
+    if not path.exists():
+        return {"success": False, "message": "No snapshot found"}
+
+    try:
+        raw = path.read_bytes()
+        if not raw.startswith(SNAPSHOT_MAGIC):
+            return {"success": False, "message": "Unrecognized snapshot format"}
+        payload = pickle.loads(raw[len(SNAPSHOT_MAGIC):])
+    except Exception as e:
+        return {"success": False, "message": f"Error reading snapshot: {e}"}
+
+    restored = 0
+    for relative, (mtime_ns, size, data) in payload["files"].items():
+        if utilities.prime_storage_cache(utilities.STORAGE_DIR / relative, mtime_ns, size, data):
+            restored += 1
+
+    timeline_entries = {}
+    for entry in payload["timeline"]:
+        timeline_entries.setdefault(entry["date"], []).append(entry)
+    timeline_fingerprints = payload.get("timeline_fingerprints", {})
+
+    reloaded = 0
+    timeline = utilities.student_timeline
+    for file_date in utilities.list_reservation_dates():
+        date_str = file_date.strftime("%Y-%m-%d")
+        if timeline.fingerprint(date_str) is not None:
+            continue
+        fingerprint = utilities.reservation_fingerprint(file_date)
+        if fingerprint is not None and timeline_fingerprints.get(date_str) == fingerprint:
+            timeline.replace_date(date_str, timeline_entries.get(date_str, []), fingerprint)
+            continue
+        reservations = utilities.load_daily_reservations(file_date)
+        if reservations:
+            utilities.index_daily_reservations(date_str, reservations, fingerprint)
+            reloaded += 1
+
+    return {
+        "success": True,
+        "created_at": payload["created_at"],
+        "restored": restored,
+        "reloaded": reloaded,
+    }
+
+
+def start_periodic_snapshots(interval_seconds: float, path: Optional[Path] = None) -> threading.Event:
+    """
+    Write a snapshot every interval_seconds from a daemon thread.
+
+    Returns:
+        Event that stops the thread when set
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval_seconds):
+            write_snapshot(path)
+
+    threading.Thread(target=run, name="reservation-snapshots", daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "dump"
+    if command == "dump":
+        ok = write_snapshot()
+        print(f"Snapshot written to {get_snapshot_filepath()}" if ok else "Snapshot failed")
+    elif command == "check":
+        print(restore_snapshot())
+    else:
+        print("Usage: python -m backend.utils.snapshot [dump|check]")
@@ -0,0 +1,186 @@
+"""In-memory index of each student's booked intervals across all days."""
+
+from datetime import datetime, timedelta
+import threading
+from typing import Optional
+
+DEFAULT_DURATION_MIN = 60
+
+
+def slot_interval(entry: dict) -> tuple[datetime, datetime]:
+    """Return the (start, end) interval covered by a reservation summary."""
+    start = datetime.strptime(f"{entry['date']} {entry['time']}", "%Y-%m-%d %H:%M")
+    duration = entry.get("duration_min") or DEFAULT_DURATION_MIN
+    return start, start + timedelta(minutes=duration)
+
+
+class StudentTimelineIndex:
+    """
+    Map student_id -> booked slots, plus slot id -> reservation summary.
+
+    Summaries have the shape produced by list_reservations_between(). Each
+    indexed day remembers the fingerprint of the day file it was read from,
+    so callers can re-index days another process has changed since.
+
+    Joins that passed the overlap check but are not written yet are held
+    separately (see hold), so concurrent joins see each other before their
+    group commit lands.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._entries: dict[str, dict] = {}
+        self._by_student: dict[str, dict[str, tuple[datetime, datetime]]] = {}
+        self._held: dict[str, dict[str, dict]] = {}
+        self._fingerprints: dict[str, object] = {}
+
+    def update_slot(self, slot_id: str, entry: Optional[dict]) -> None:
+        """
+        Replace the indexed state of one slot.
+
+        Args:
+            slot_id: Room id ("YYYY-MM-DD|court|HH:MM")
+            entry: Current reservation summary, or None if the slot is empty
+        """
+        with self._lock:
+            previous = self._entries.pop(slot_id, None)
+            if previous:
+                for student_id in previous.get("participants", []):
+                    bookings = self._by_student.get(student_id)
+                    if bookings is not None:
+                        bookings.pop(slot_id, None)
+                        if not bookings:
+                            del self._by_student[student_id]
+            if not entry or not entry.get("participants"):
+                return
+            self._entries[slot_id] = entry
+            interval = slot_interval(entry)
+            for student_id in entry["participants"]:
+                self._by_student.setdefault(student_id, {})[slot_id] = interval
+
+    def entries(self) -> list[dict]:
+        """Return the summaries of every indexed slot."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def drop_date(self, date_str: str) -> None:
+        """Forget every slot on the given date (YYYY-MM-DD)."""
+        with self._lock:
+            prefix = f"{date_str}|"
+            for slot_id in [sid for sid in self._entries if sid.startswith(prefix)]:
+                self.update_slot(slot_id, None)
+            self._fingerprints.pop(date_str, None)
+
+    def replace_date(self, date_str: str, entries: list[dict], fingerprint: object) -> None:
+        """
+        Replace every slot of one date, as read from a day file.
+
+        Args:
+            date_str: Date (YYYY-MM-DD)
+            entries: Summaries of the day's booked slots
+            fingerprint: Version of the day file the entries were read from
+        """
+        with self._lock:
+            self.drop_date(date_str)
+            for entry in entries:
+                self.update_slot(entry["id"], entry)
+            self._fingerprints[date_str] = fingerprint
+
+    def fingerprint(self, date_str: str) -> object:
+        """Return the day file version a date was indexed from, or None if it wasn't."""
+        with self._lock:
+            return self._fingerprints.get(date_str)
+
+    def touch(self, date_str: str, fingerprint: object) -> None:
+        """Record the day file version after this process wrote a change it already applied."""
+        with self._lock:
+            if date_str in self._fingerprints:
+                self._fingerprints[date_str] = fingerprint
+
+    def export(self) -> tuple[list[dict], dict[str, object]]:
+        """Return every indexed summary and the per-date fingerprints, taken together."""
+        with self._lock:
+            return list(self._entries.values()), dict(self._fingerprints)
+
+    def indexed_dates(self) -> list[str]:
+        """Return the dates indexed from day files."""
+        with self._lock:
+            return list(self._fingerprints)
+
+    def reservations_for(
+        self,
+        student_id: str,
+        start_date: Optional[datetime] = None,
+        days: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Return the student's reservation summaries ordered by start time.
+
+        Args:
+            student_id: Student ID to look up
+            start_date: Only include slots on or after this date
+            days: Number of days (from start_date) to include
+        """
+        with self._lock:
+            bookings = dict(self._by_student.get(student_id, {}))
+            entries = {slot_id: self._entries[slot_id] for slot_id in bookings}
+
+        first_day = start_date.date() if start_date else None
+        last_day = first_day + timedelta(days=days - 1) if first_day and days else None
+        results = []
+        for slot_id, (start, _) in sorted(bookings.items(), key=lambda item: item[1]):
+            if first_day and start.date() < first_day:
+                continue
+            if last_day and start.date() > last_day:
+                continue
+            results.append(entries[slot_id])
+        return results
+
+    def find_conflict(self, student_id: str, entry: dict) -> Optional[dict]:
+        """
+        Return a booked or held slot of the student overlapping entry, if any.
+
+        Args:
+            student_id: Student about to join
+            entry: Summary of the slot being joined (date, time, duration_min)
+        """
+        start, end = slot_interval(entry)
+        with self._lock:
+            for slot_id, (booked_start, booked_end) in self._by_student.get(student_id, {}).items():
+                if slot_id == entry.get("id"):
+                    continue
+                if booked_start < end and start < booked_end:
+                    return self._entries[slot_id]
+            for slot_id, held in self._held.get(student_id, {}).items():
+                if slot_id == entry.get("id"):
+                    continue
+                held_start, held_end = slot_interval(held)
+                if held_start < end and start < held_end:
+                    return held
+        return None
+
+    def hold(self, student_id: str, entry: dict) -> Optional[dict]:
+        """
+        Check a join for overlaps and, if there are none, hold its slot.
+
+        The check and the hold are atomic, so of two concurrent overlapping
+        joins only one passes. Release the hold once the join is written
+        (or has failed); by then a written join is in the index itself.
+
+        Returns:
+            The conflicting booked or held slot, or None if the hold was taken
+        """
+        with self._lock:
+            conflict = self.find_conflict(student_id, entry)
+            if conflict is None:
+                self._held.setdefault(student_id, {})[entry["id"]] = entry
+            return conflict
+
+    def release_hold(self, student_id: str, slot_id: str) -> None:
+        """Drop a hold taken by hold()."""
+        with self._lock:
+            held = self._held.get(student_id)
+            if held is not None:
+                held.pop(slot_id, None)
+                if not held:
+                    del self._held[student_id]
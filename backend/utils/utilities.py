@@ -1,16 +1,17 @@
 """Utility helpers for reservations and user registration."""
 
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-import json
 import re
-from typing import Optional, Literal
-import sys
+from typing import Callable, Iterator, Optional, Literal
+import os
 import random
+import threading
+import time
+import uuid
 
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from storage.storage_template import (
+from ..storage.storage_template import (
     DailyReservations,
     CourtReservations,
     TimeSlot,
@@ -18,6 +19,9 @@ from storage.storage_template import (
     Users,
     User,
 )
+from .file_codecs import decode, encode, resolve_encoding
+from .timeline_index import DEFAULT_DURATION_MIN, StudentTimelineIndex
+from .write_behind import GroupCommitStore
 
 
 def generate_access_code(length: int = 6) -> str:
@@ -26,11 +30,192 @@ def generate_access_code(length: int = 6) -> str:
     return "".join(random.choice(alphabet) for _ in range(length))
 
 
-# Storage directories
-STORAGE_DIR = Path(__file__).parent.parent / "storage"
+# Storage directories (RESERVATION_STORAGE_DIR points a process at another tree)
+STORAGE_DIR = Path(os.environ.get("RESERVATION_STORAGE_DIR") or Path(__file__).parent.parent / "storage")
 RESERVATIONS_DIR = STORAGE_DIR / "reservations"
 USERS_FILE = STORAGE_DIR / "users.json"
 
+# Reject joins that overlap another of the student's bookings when enabled
+PREVENT_DOUBLE_BOOKING = os.environ.get("PREVENT_DOUBLE_BOOKING", "0") == "1"
+
+# Durability of storage writes: fsync each write, and how long (ms) a day's
+# pending mutations wait for others to join the same group commit
+FSYNC_WRITES = os.environ.get("WRITE_FSYNC", "1") != "0"
+WRITE_BATCH_DELAY_MS = float(os.environ.get("WRITE_BATCH_DELAY_MS", "2"))
+
+# Age (seconds) after which a storage temp file is taken to be left by a crash
+STALE_TEMP_FILE_SECONDS = float(os.environ.get("STALE_TEMP_FILE_SECONDS", "300"))
+
+# Encoding of newly written day files (see file_codecs.py); any is readable
+DAY_FILE_ENCODING = resolve_encoding(os.environ.get("DAY_FILE_ENCODING", "json"))
+
+# Per-student booked intervals across all days, built lazily from disk
+student_timeline = StudentTimelineIndex()
+
+# Parsed JSON of storage files, valid while the file's (mtime_ns, size) match
+_json_cache: dict[Path, tuple[int, int, object]] = {}
+
+# Serializes read-modify-write of users.json (registration) in this process
+_users_lock = threading.Lock()
+
+# Callbacks that may fill a newly provisioned day before its first save
+_day_provisioners: list[Callable[[datetime, DailyReservations], None]] = []
+
+# Callbacks notified after a timeslot mutation has been saved
+_reservation_listeners: list[Callable[[dict], None]] = []
+
+
+def register_reservation_listener(callback: Callable[[dict], None]) -> None:
+    """
+    Register a callback invoked after every saved timeslot mutation.
+    
+    The callback receives a change dict with "action" ("join", "leave",
+    "clear", "waitlist" or "promote"), "date" (YYYY-MM-DD), "court", "time",
+    "user_id" and the saved slot's summary "entry" (see summarize_timeslot).
+    Clears also carry "removed_players" and "removed_waitlist"; a leave that
+    frees a spot for a waiter is followed by a "promote" change for them.
+    """
+    if callback not in _reservation_listeners:
+        _reservation_listeners.append(callback)
+
+
+def register_day_provisioner(callback: Callable[[datetime, DailyReservations], None]) -> None:
+    """
+    Register a callback run on every newly created day before it is saved.
+    
+    The callback receives the date and the fresh DailyReservations and may
+    book slots in place (e.g. recurring rooms); the day is written once.
+    """
+    if callback not in _day_provisioners:
+        _day_provisioners.append(callback)
+
+
+def _notify_reservation_listeners(change: dict) -> None:
+    """Dispatch a change to all listeners; a failing listener never fails the write."""
+    for callback in list(_reservation_listeners):
+        try:
+            callback(change)
+        except Exception as e:
+            print(f"Error in reservation listener: {e}")
+
+
+def _stat_key(filepath: Path) -> tuple[int, int]:
+    stat = filepath.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_storage_file(filepath: Path) -> object:
+    """Read a storage file in any encoding, reusing the parsed data if the file is unchanged."""
+    mtime_ns, size = _stat_key(filepath)
+    cached = _json_cache.get(filepath)
+    if cached and cached[0] == mtime_ns and cached[1] == size:
+        return cached[2]
+    data = decode(filepath.read_bytes())
+    _json_cache[filepath] = (mtime_ns, size, data)
+    return data
+
+
+def temp_path_for(filepath: Path) -> Path:
+    """
+    Return a temp file path next to filepath that no other writer uses.
+    
+    The pid and a random suffix keep writers in different worker processes
+    apart: "users.json" -> "users.json.<pid>.<hex>.tmp".
+    """
+    return filepath.with_name(f"{filepath.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def write_storage_file(filepath: Path, data: object, encoding: str = "json") -> None:
+    """Replace a storage file atomically, so a crash never leaves it torn."""
+    tmp_path = temp_path_for(filepath)
+    try:
+        with tmp_path.open("xb") as f:
+            f.write(encode(data, encoding))
+            if FSYNC_WRITES:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if FSYNC_WRITES and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(filepath.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    _json_cache[filepath] = (*_stat_key(filepath), data)
+
+
+def _commit_daily_reservations(date: datetime, data: dict) -> bool:
+    """Write a day's model_dump() data for the group-commit store."""
+    try:
+        RESERVATIONS_DIR.mkdir(parents=True, exist_ok=True)
+        write_storage_file(get_reservation_filepath(date), data, DAY_FILE_ENCODING)
+        return True
+    except Exception as e:
+        print(f"Error saving reservations for {date.date()}: {e}")
+        return False
+
+
+def reservation_fingerprint(date: datetime) -> tuple[int, int] | None:
+    """Identify the version of a day file on disk: (mtime_ns, size), or None if missing."""
+    try:
+        return _stat_key(get_reservation_filepath(date))
+    except OSError:
+        return None
+
+
+def recover_interrupted_writes(min_age_seconds: float = STALE_TEMP_FILE_SECONDS) -> int:
+    """
+    Remove temporary files left by writes interrupted by a crash.
+    
+    Storage files are replaced atomically, so the real files always hold
+    the last committed version and leftovers can simply be discarded. Only
+    temp files untouched for min_age_seconds are removed: a younger one may
+    belong to a write in progress in another worker process.
+    
+    Returns:
+        Number of files removed
+    """
+    removed = 0
+    cutoff = time.time() - min_age_seconds
+    for directory in (STORAGE_DIR, RESERVATIONS_DIR):
+        if not directory.exists():
+            continue
+        for tmp_path in directory.glob("*.tmp"):
+            try:
+                if tmp_path.stat().st_mtime > cutoff:
+                    continue
+                tmp_path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"Error removing {tmp_path.name}: {e}")
+    return removed
+
+
+def cached_storage_files() -> dict[Path, tuple[int, int, object]]:
+    """Return a copy of the parsed storage file cache: path -> (mtime_ns, size, data)."""
+    return dict(_json_cache)
+
+
+def prime_storage_cache(filepath: Path, mtime_ns: int, size: int, data: object) -> bool:
+    """
+    Seed the parsed storage file cache, e.g. from a snapshot.
+    
+    Returns:
+        True if the file on disk still matches (mtime_ns, size) and was seeded
+    """
+    try:
+        if _stat_key(filepath) != (mtime_ns, size):
+            return False
+    except OSError:
+        return False
+    _json_cache[filepath] = (mtime_ns, size, data)
+    return True
+
 
 def validate_user_id(user_id: str) -> tuple[bool, str]:
     """
@@ -60,9 +245,7 @@ def load_users() -> Optional[Users]:
         return None
     
     try:
-        with USERS_FILE.open("r") as f:
-            data = json.load(f)
-        return Users.model_validate(data)
+        return Users.model_validate(_read_storage_file(USERS_FILE))
     except Exception as e:
         print(f"Error loading users: {e}")
         return None
@@ -81,8 +264,7 @@ def save_users(users: Users) -> bool:
     try:
         STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
-        with USERS_FILE.open("w") as f:
-            json.dump(users.model_dump(), f, indent=2)
+        write_storage_file(USERS_FILE, users.model_dump())
         return True
     except Exception as e:
         print(f"Error saving users: {e}")
@@ -106,28 +288,34 @@ def get_or_register_user(user_id: str, name: None | str) -> tuple[bool, str, dic
     if not is_valid:
         return False, error_msg, {}
     
-    # Load existing users
-    users = load_users()
-    if users is None:
-        # Create new Users object if file doesn't exist
-        users = Users({})
-    
     # If user exists, return it
-    if user_id in users.root:
+    users = load_users()
+    if users is not None and user_id in users.root:
         user_data = users.root[user_id].model_dump()
         return True, "Existing user", user_data
     
-    # Register new user
-    if name is None:
-        name = f"User {user_id}"
-    
-    users.root[user_id] = User(name=name)
-    
-    if save_users(users):
-        user_data = users.root[user_id].model_dump()
-        return True, f"New user registered: {name}", user_data
-    else:
-        return False, "Error saving new user", {}
+    # Register under the lock, re-reading so concurrent registrations aren't lost
+    with _users_lock:
+        users = load_users()
+        if users is None:
+            # Create new Users object if file doesn't exist
+            users = Users({})
+        
+        if user_id in users.root:
+            user_data = users.root[user_id].model_dump()
+            return True, "Existing user", user_data
+        
+        # Register new user
+        if name is None:
+            name = f"User {user_id}"
+        
+        users.root[user_id] = User(name=name)
+        
+        if save_users(users):
+            user_data = users.root[user_id].model_dump()
+            return True, f"New user registered: {name}", user_data
+        else:
+            return False, "Error saving new user", {}
 
 
 def get_reservation_filename(date: datetime) -> str:
@@ -164,9 +352,7 @@ def load_daily_reservations(date: datetime) -> Optional[DailyReservations]:
         return None
     
     try:
-        with filepath.open("r") as f:
-            data = json.load(f)
-        return DailyReservations.model_validate(data)
+        return DailyReservations.model_validate(_read_storage_file(filepath))
     except Exception as e:
         print(f"Error loading reservations for {date.date()}: {e}")
         return None
@@ -188,14 +374,22 @@ def save_daily_reservations(date: datetime, reservations: DailyReservations) ->
     try:
         RESERVATIONS_DIR.mkdir(parents=True, exist_ok=True)
 
-        with filepath.open("w") as f:
-            json.dump(reservations.model_dump(), f, indent=2)
+        write_storage_file(filepath, reservations.model_dump(), DAY_FILE_ENCODING)
         return True
     except Exception as e:
         print(f"Error saving reservations for {date.date()}: {e}")
         return False
 
 
+# Live day state shared by all mutations; see write_behind.py
+day_store = GroupCommitStore(
+    load=load_daily_reservations,
+    write=_commit_daily_reservations,
+    fingerprint=reservation_fingerprint,
+    max_delay_ms=WRITE_BATCH_DELAY_MS,
+)
+
+
 def cleanup_old_reservations() -> int:
     """
     Delete reservation files older than today.
@@ -220,6 +414,9 @@ def cleanup_old_reservations() -> int:
             # Delete if in the past
             if file_date < today:
                 filepath.unlink()
+                _json_cache.pop(filepath, None)
+                day_store.forget(date_str)
+                student_timeline.drop_date(date_str)
                 deleted_count += 1
                 print(f"Deleted old reservation file: {filepath.name}")
         except Exception as e:
@@ -228,6 +425,52 @@ def cleanup_old_reservations() -> int:
     return deleted_count
 
 
+def _provision_day(
+    date: datetime,
+    courts: dict[str, tuple[CourtType, int]],
+    timeslots: list[str],
+) -> tuple[DailyReservations, bool]:
+    """
+    Build a new day, let provisioners fill it, and save it in one write.
+    
+    If a provisioner fails the day is not saved, so the next
+    ensure_reservations_for_date() provisions it again.
+    
+    Returns:
+        Tuple of (reservations, saved)
+    """
+    courts_data = {}
+    for court_name, (court_type, capacity) in courts.items():
+        timeslots_data = {
+            time: TimeSlot(players_id=[], status="available", type="public")
+            for time in timeslots
+        }
+        courts_data[court_name] = CourtReservations(
+            type=court_type,
+            capacity=capacity,
+            timeslots=timeslots_data,
+        )
+
+    reservations = DailyReservations(courts_data)
+    for callback in list(_day_provisioners):
+        try:
+            callback(date, reservations)
+        except Exception as e:
+            # Provisioners only run for a day's first save, so saving without
+            # their bookings would lose them for good; retry on next access.
+            print(f"Error provisioning reservations for {date.date()}, not saving the day: {e}")
+            return reservations, False
+
+    saved = save_daily_reservations(date, reservations)
+    if saved:
+        date_str = date.strftime("%Y-%m-%d")
+        for court_name, court in reservations.root.items():
+            for time_str, slot in court.timeslots.items():
+                if slot.players_id:
+                    record_timeslot_change("join", date_str, court_name, court, time_str, slot, slot.owner_id)
+    return reservations, saved
+
+
 def initialize_reservations_for_next_10_days(
     courts: dict[str, tuple[CourtType, int]],
     timeslots: list[str],
@@ -242,20 +485,8 @@ def initialize_reservations_for_next_10_days(
         if filepath.exists():
             continue
 
-        courts_data = {}
-        for court_name, (court_type, capacity) in courts.items():
-            timeslots_data = {
-                time: TimeSlot(players_id=[], status="available", type="public")
-                for time in timeslots
-            }
-            courts_data[court_name] = CourtReservations(
-                type=court_type,
-                capacity=capacity,
-                timeslots=timeslots_data,
-            )
-
-        reservations = DailyReservations(courts_data)
-        if save_daily_reservations(target_date, reservations):
+        _, saved = _provision_day(target_date, courts, timeslots)
+        if saved:
             created_count += 1
             print(f"Created reservation file for {target_date.date()}")
 
@@ -272,23 +503,175 @@ def ensure_reservations_for_date(
     if reservations:
         return reservations
 
-    courts_data = {}
-    for court_name, (court_type, capacity) in courts.items():
-        timeslots_data = {
-            time: TimeSlot(players_id=[], status="available", type="public")
-            for time in timeslots
-        }
-        courts_data[court_name] = CourtReservations(
-            type=court_type,
-            capacity=capacity,
-            timeslots=timeslots_data,
-        )
-
-    reservations = DailyReservations(courts_data)
-    save_daily_reservations(date, reservations)
+    reservations, _ = _provision_day(date, courts, timeslots)
     return reservations
 
 
+def summarize_timeslot(
+    date_str: str,
+    court_name: str,
+    court: CourtReservations,
+    time_str: str,
+    slot: TimeSlot,
+) -> dict:
+    """Build the reservation summary dict for a single timeslot."""
+    return {
+        "id": f"{date_str}|{court_name}|{time_str}",
+        "date": date_str,
+        "time": time_str,
+        "court": court_name,
+        "court_type": court.type.value,
+        "capacity": court.capacity,
+        "participants": list(slot.players_id),
+        "owner_id": slot.owner_id,
+        "room_name": slot.room_name,
+        "privacy": slot.type,
+        "duration_min": slot.duration_min,
+        "status": slot.status,
+        "access_code": slot.access_code,
+        "reservation_name": slot.reservation_name,
+        "activity_label": slot.court_type,
+        "waitlist": list(slot.waitlist),
+        "version": slot.version,
+    }
+
+
+def index_daily_reservations(date_str: str, reservations: DailyReservations, fingerprint: object = None) -> None:
+    """
+    Replace the student timeline entries of one day with its current slots.
+    
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        reservations: The day's reservations
+        fingerprint: reservation_fingerprint() taken before reservations were
+            read; None makes the next ensure_student_timeline() re-index the day
+    """
+    entries = [
+        summarize_timeslot(date_str, court_name, court, time_str, slot)
+        for court_name, court in reservations.root.items()
+        for time_str, slot in court.timeslots.items()
+        if slot.players_id
+    ]
+    student_timeline.replace_date(date_str, entries, fingerprint)
+
+
+def publish_timeslot_change(action: str, entry: dict, user_id: str | None, **extra) -> None:
+    """Refresh in-memory indexes for a saved timeslot summary and notify listeners."""
+    student_timeline.update_slot(entry["id"], entry)
+    student_timeline.touch(entry["date"], reservation_fingerprint(datetime.strptime(entry["date"], "%Y-%m-%d")))
+    _notify_reservation_listeners({
+        "action": action,
+        "date": entry["date"],
+        "court": entry["court"],
+        "time": entry["time"],
+        "user_id": user_id,
+        **extra,
+        "entry": entry,
+    })
+
+
+def record_timeslot_change(
+    action: str,
+    date_str: str,
+    court_name: str,
+    court: CourtReservations,
+    timeslot: str,
+    slot: TimeSlot,
+    user_id: str | None,
+    **extra,
+) -> dict:
+    """
+    Publish the change of a timeslot that has just been saved.
+    
+    Returns:
+        The slot's reservation summary
+    """
+    entry = summarize_timeslot(date_str, court_name, court, timeslot, slot)
+    publish_timeslot_change(action, entry, user_id, **extra)
+    return entry
+
+
+def list_reservation_dates() -> list[datetime]:
+    """Return the dates of all reservation files on disk, oldest first."""
+    dates = []
+    if not RESERVATIONS_DIR.exists():
+        return dates
+    for filepath in RESERVATIONS_DIR.glob("reservations_*.json"):
+        try:
+            dates.append(datetime.strptime(filepath.stem.split("_")[1], "%Y-%m-%d"))
+        except (IndexError, ValueError):
+            continue
+    return sorted(dates)
+
+
+def ensure_student_timeline(start_date: Optional[datetime] = None, days: Optional[int] = None) -> StudentTimelineIndex:
+    """
+    Bring the student timeline index up to date with the day files on disk.
+    
+    A day is (re)indexed when it isn't indexed yet or its file has changed
+    since, e.g. because another worker process wrote it; indexed days whose
+    file is gone are dropped.
+    
+    Args:
+        start_date: Only check days on or after this date
+        days: Number of days (from start_date) to check
+    """
+    first = start_date.date() if start_date else None
+    last = first + timedelta(days=days - 1) if first and days else None
+    
+    def in_range(day) -> bool:
+        return (first is None or day >= first) and (last is None or day <= last)
+    
+    on_disk = set()
+    for file_date in list_reservation_dates():
+        if not in_range(file_date.date()):
+            continue
+        date_str = file_date.strftime("%Y-%m-%d")
+        on_disk.add(date_str)
+        # Fingerprint first: a write racing the load only causes a re-index.
+        fingerprint = reservation_fingerprint(file_date)
+        if fingerprint is None or student_timeline.fingerprint(date_str) == fingerprint:
+            continue
+        reservations = load_daily_reservations(file_date)
+        if reservations:
+            index_daily_reservations(date_str, reservations, fingerprint)
+    
+    for date_str in student_timeline.indexed_dates():
+        if date_str not in on_disk and in_range(datetime.strptime(date_str, "%Y-%m-%d").date()):
+            student_timeline.drop_date(date_str)
+    return student_timeline
+
+
+def list_student_reservations(user_id: str, start_date: datetime, days: int = 7) -> list[dict]:
+    """
+    Return reservation summaries the student owns or joined in a date range.
+    
+    Served from the student timeline index; only days whose file changed
+    since they were indexed are read again.
+    """
+    return ensure_student_timeline(start_date, days).reservations_for(user_id, start_date, days)
+
+
+@contextmanager
+def _held_bookings(user_id: str) -> Iterator[list[str]]:
+    """Collect slot ids held in the student timeline and release them on exit."""
+    held: list[str] = []
+    try:
+        yield held
+    finally:
+        for slot_id in held:
+            student_timeline.release_hold(user_id, slot_id)
+
+
+def _stale_version_result(slot: TimeSlot) -> dict:
+    return {
+        "success": False,
+        "stale": True,
+        "message": f"Room has changed (now at version {slot.version}); reload and retry",
+        "version": slot.version,
+    }
+
+
 def sync_timeslot_status(timeslot: TimeSlot, capacity: int) -> None:
     """
     Synchronize the status field with the current player count.
@@ -315,6 +698,7 @@ def add_player_to_timeslot(
     access_code: str | None = None,
     reservation_name: str = "",
     court_type_label: str = "",
+    expected_version: int | None = None,
 ) -> dict:
     """
     Add a player to a specific timeslot and auto-update status.
@@ -329,6 +713,7 @@ def add_player_to_timeslot(
         timeslot_type: "private" or "public" (only applies to first player)
         reservation_name: Optional name for the reservation (only applies to first player)
         court_type: User-defined court/activity type (only applies to first player)
+        expected_version: Fail with "stale" unless the slot is at this version
     
     Returns:
         Dictionary with success status and message
@@ -345,66 +730,87 @@ def add_player_to_timeslot(
     # Note if user was just registered
     is_new_user = "registered" in message.lower()
     
-    # Load reservations for the date
-    reservations = load_daily_reservations(date)
-    if not reservations:
-        return {"success": False, "message": "No reservations found for this date"}
-    
-    # Get the court
-    court = reservations.root.get(court_name)
-    if not court:
-        return {"success": False, "message": f"Court '{court_name}' not found"}
-    
-    # Get the timeslot
-    slot = court.timeslots.get(timeslot)
-    if not slot:
-        return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
-    
-    # Validation
-    if user_id in slot.players_id:
-        return {"success": False, "message": "Already joined this timeslot"}
-    
-    if len(slot.players_id) >= court.capacity:
-        return {"success": False, "message": "Timeslot is full"}
-    
-    # Check if trying to join a private timeslot
-    normalized_code = (access_code or "").strip().upper() or None
+    date_str = date.strftime("%Y-%m-%d")
+    with day_store.transaction(date) as txn, _held_bookings(user_id) as held:
+        # Load reservations for the date
+        reservations = txn.reservations
+        if not reservations:
+            return {"success": False, "message": "No reservations found for this date"}
+        
+        # Get the court
+        court = reservations.root.get(court_name)
+        if not court:
+            return {"success": False, "message": f"Court '{court_name}' not found"}
+        
+        # Get the timeslot
+        slot = court.timeslots.get(timeslot)
+        if not slot:
+            return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
+        
+        if expected_version is not None and slot.version != expected_version:
+            return _stale_version_result(slot)
+        
+        # Validation
+        if user_id in slot.players_id:
+            return {"success": False, "message": "Already joined this timeslot"}
+        
+        if len(slot.players_id) >= court.capacity:
+            return {"success": False, "message": "Timeslot is full"}
+        
+        # Check if trying to join a private timeslot
+        normalized_code = (access_code or "").strip().upper() or None
 
-    if slot.type == "private" and len(slot.players_id) > 0:
-        if not normalized_code or slot.access_code != normalized_code:
-            return {"success": False, "message": "Invalid or missing access code for this private room."}
-    
-    # Set type, reservation name, and court type if this is the first player
-    is_first_player = len(slot.players_id) == 0
-    if is_first_player:
-        slot.type = timeslot_type
-        slot.owner_id = user_id
-        slot.room_name = (room_name or reservation_name or f"{court_name} {timeslot}")
-        slot.duration_min = duration_min
-        slot.reservation_name = reservation_name or slot.reservation_name
-        slot.court_type = court_type_label or slot.court_type
-        if timeslot_type == "private":
-            slot.access_code = normalized_code or generate_access_code()
+        if slot.type == "private" and len(slot.players_id) > 0:
+            if not normalized_code or slot.access_code != normalized_code:
+                return {"success": False, "message": "Invalid or missing access code for this private room."}
+        
+        if PREVENT_DOUBLE_BOOKING:
+            candidate = summarize_timeslot(date_str, court_name, court, timeslot, slot)
+            if not slot.players_id:
+                candidate["duration_min"] = duration_min
+            # Held until the commit below returns, so joins waiting in the
+            # same group commit see this one.
+            # Bookings on neighbouring days may run across midnight.
+            conflict = ensure_student_timeline(date - timedelta(days=1), 3).hold(user_id, candidate)
+            if conflict:
+                return {
+                    "success": False,
+                    "message": f"Overlaps your booking at {conflict['court']} on {conflict['date']} {conflict['time']}",
+                }
+            held.append(candidate["id"])
+        
+        # Set type, reservation name, and court type if this is the first player
+        is_first_player = len(slot.players_id) == 0
+        if is_first_player:
+            slot.type = timeslot_type
+            slot.owner_id = user_id
+            slot.room_name = (room_name or reservation_name or f"{court_name} {timeslot}")
+            slot.duration_min = duration_min
+            slot.reservation_name = reservation_name or slot.reservation_name
+            slot.court_type = court_type_label or slot.court_type
+            if timeslot_type == "private":
+                slot.access_code = normalized_code or generate_access_code()
+            else:
+                slot.access_code = None
         else:
-            slot.access_code = None
-    else:
-        if not slot.room_name and room_name:
-            slot.room_name = room_name
-        if reservation_name and not slot.reservation_name:
-            slot.reservation_name = reservation_name
-        if court_type_label and not slot.court_type:
-            slot.court_type = court_type_label
-        if slot.type == "private" and slot.access_code:
-            normalized_code = slot.access_code
-    
-    # Add player
-    slot.players_id.append(user_id)
-    
-    # Auto-update status
-    sync_timeslot_status(slot, court.capacity)
-    
-    # Save changes
-    if save_daily_reservations(date, reservations):
+            if not slot.room_name and room_name:
+                slot.room_name = room_name
+            if reservation_name and not slot.reservation_name:
+                slot.reservation_name = reservation_name
+            if court_type_label and not slot.court_type:
+                slot.court_type = court_type_label
+            if slot.type == "private" and slot.access_code:
+                normalized_code = slot.access_code
+        
+        # Add player
+        slot.players_id.append(user_id)
+        if user_id in slot.waitlist:
+            slot.waitlist.remove(user_id)
+        
+        # Auto-update status
+        sync_timeslot_status(slot, court.capacity)
+        slot.version += 1
+        
         result = {
             "success": True,
             "message": f"Successfully joined {court_name} at {timeslot}",
@@ -418,6 +824,7 @@ def add_player_to_timeslot(
             "room_name": slot.room_name,
             "owner_id": slot.owner_id,
             "duration_min": slot.duration_min or 60,
+            "version": slot.version,
         }
         
         if is_first_player:
@@ -433,16 +840,98 @@ def add_player_to_timeslot(
             result["new_user_registered"] = True
             result["message"] += f" (New user '{user_data['name']}' registered)"
         
-        return result
-    else:
+        # Save changes
+        entry = summarize_timeslot(date_str, court_name, court, timeslot, slot)
+        committed = txn.commit(lambda: publish_timeslot_change("join", entry, user_id))
+    
+    if not committed:
         return {"success": False, "message": "Error saving reservation"}
+    return result
+
+
+def add_player_to_waitlist(
+    date: datetime,
+    court_name: str,
+    timeslot: str,
+    user_id: str,
+    user_name: str | None = None,
+    access_code: str | None = None,
+    expected_version: int | None = None,
+) -> dict:
+    """
+    Queue a player for a full timeslot.
+    
+    Waiters are promoted in FIFO order by remove_player_from_timeslot as
+    spots free up.
+    
+    Args:
+        date: The date for the reservation
+        court_name: Name of the court (e.g., "Court A")
+        timeslot: Time in HH:MM format (e.g., "09:00")
+        user_id: Student ID to queue (must be 7 digits)
+        user_name: Optional name for new users
+        access_code: Invite code, required for private rooms
+        expected_version: Fail with "stale" unless the slot is at this version
+    
+    Returns:
+        Dictionary with success status, message and waitlist position
+    """
+    success, message, _ = get_or_register_user(user_id, user_name)
+    if not success:
+        return {"success": False, "message": message}
+    
+    with day_store.transaction(date) as txn:
+        reservations = txn.reservations
+        if not reservations:
+            return {"success": False, "message": "No reservations found for this date"}
+        
+        court = reservations.root.get(court_name)
+        if not court:
+            return {"success": False, "message": f"Court '{court_name}' not found"}
+        
+        slot = court.timeslots.get(timeslot)
+        if not slot:
+            return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
+        
+        if expected_version is not None and slot.version != expected_version:
+            return _stale_version_result(slot)
+        
+        if user_id in slot.players_id:
+            return {"success": False, "message": "Already joined this timeslot"}
+        
+        if user_id in slot.waitlist:
+            return {"success": False, "message": "Already on the waitlist for this timeslot"}
+        
+        if len(slot.players_id) < court.capacity:
+            return {"success": False, "message": "Timeslot is not full; join it directly"}
+        
+        normalized_code = (access_code or "").strip().upper() or None
+        if slot.type == "private" and slot.access_code != normalized_code:
+            return {"success": False, "message": "Invalid or missing access code for this private room."}
+        
+        slot.waitlist.append(user_id)
+        slot.version += 1
+        
+        result = {
+            "success": True,
+            "message": f"Added to the waitlist for {court_name} at {timeslot}",
+            "position": len(slot.waitlist),
+            "version": slot.version,
+        }
+        entry = summarize_timeslot(date.strftime("%Y-%m-%d"), court_name, court, timeslot, slot)
+        committed = txn.commit(lambda: publish_timeslot_change("waitlist", entry, user_id))
+    
+    if not committed:
+        return {"success": False, "message": "Error saving reservation"}
+    return result
 
 
 def remove_player_from_timeslot(
     date: datetime,
     court_name: str,
     timeslot: str,
-    user_id: str
+    user_id: str,
+    expected_version: int | None = None,
 ) -> dict:
     """
     Remove a player from a specific timeslot and auto-update status.
@@ -452,49 +941,78 @@ def remove_player_from_timeslot(
         court_name: Name of the court (e.g., "Court A")
         timeslot: Time in HH:MM format (e.g., "09:00")
         user_id: Student ID to remove
+        expected_version: Fail with "stale" unless the slot is at this version
     
     Returns:
         Dictionary with success status and message
     """
-    # Load reservations for the date
-    reservations = load_daily_reservations(date)
-    if not reservations:
-        return {"success": False, "message": "No reservations found for this date"}
-    
-    # Get the court
-    court = reservations.root.get(court_name)
-    if not court:
-        return {"success": False, "message": f"Court '{court_name}' not found"}
-    
-    # Get the timeslot
-    slot = court.timeslots.get(timeslot)
-    if not slot:
-        return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
-    
-    # Check if user is in the timeslot
-    if user_id not in slot.players_id:
-        return {"success": False, "message": "Not in this timeslot"}
-    
-    # Remove player
-    slot.players_id.remove(user_id)
-
-    # If owner leaves, promote next participant or reset metadata
-    if slot.owner_id == user_id:
-        slot.owner_id = slot.players_id[0] if slot.players_id else None
-        if not slot.owner_id:
-            slot.room_name = None
-            slot.type = "public"
-            slot.duration_min = None
-            slot.access_code = None
-            slot.reservation_name = ""
-            slot.court_type = ""
-    
-    # Auto-update status
-    sync_timeslot_status(slot, court.capacity)
-    
-    # Save changes
-    if save_daily_reservations(date, reservations):
-        return {
+    date_str = date.strftime("%Y-%m-%d")
+    with day_store.transaction(date) as txn:
+        # Load reservations for the date
+        reservations = txn.reservations
+        if not reservations:
+            return {"success": False, "message": "No reservations found for this date"}
+        
+        # Get the court
+        court = reservations.root.get(court_name)
+        if not court:
+            return {"success": False, "message": f"Court '{court_name}' not found"}
+        
+        # Get the timeslot
+        slot = court.timeslots.get(timeslot)
+        if not slot:
+            return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
+        
+        if expected_version is not None and slot.version != expected_version:
+            return _stale_version_result(slot)
+        
+        # Leaving the waitlist frees no spot
+        if user_id in slot.waitlist and user_id not in slot.players_id:
+            slot.waitlist.remove(user_id)
+            slot.version += 1
+            result = {
+                "success": True,
+                "message": f"Left the waitlist for {court_name} at {timeslot}",
+                "status": slot.status,
+                "current_players": len(slot.players_id),
+                "capacity": court.capacity,
+                "owner_id": slot.owner_id,
+                "room_name": slot.room_name,
+                "version": slot.version,
+            }
+            entry = summarize_timeslot(date_str, court_name, court, timeslot, slot)
+            committed = txn.commit(lambda: publish_timeslot_change("waitlist", entry, user_id))
+            return result if committed else {"success": False, "message": "Error saving reservation"}
+        
+        # Check if user is in the timeslot
+        if user_id not in slot.players_id:
+            return {"success": False, "message": "Not in this timeslot"}
+        
+        # Remove player
+        slot.players_id.remove(user_id)
+
+        # Hand the freed spot to the first waiter in the same write
+        promoted_id = None
+        if slot.waitlist and len(slot.players_id) < court.capacity:
+            promoted_id = slot.waitlist.pop(0)
+            slot.players_id.append(promoted_id)
+
+        # If owner leaves, promote next participant or reset metadata
+        if slot.owner_id == user_id:
+            slot.owner_id = slot.players_id[0] if slot.players_id else None
+            if not slot.owner_id:
+                slot.room_name = None
+                slot.type = "public"
+                slot.duration_min = None
+                slot.access_code = None
+                slot.reservation_name = ""
+                slot.court_type = ""
+        
+        # Auto-update status
+        sync_timeslot_status(slot, court.capacity)
+        slot.version += 1
+        
+        result = {
             "success": True,
             "message": f"Successfully left {court_name} at {timeslot}",
             "status": slot.status,
@@ -502,30 +1020,32 @@ def remove_player_from_timeslot(
             "capacity": court.capacity,
             "owner_id": slot.owner_id,
             "room_name": slot.room_name,
+            "version": slot.version,
         }
-    else:
-        return {"success": False, "message": "Error saving reservation"}
+        if promoted_id:
+            result["promoted_id"] = promoted_id
+        
+        # Save changes
+        entry = summarize_timeslot(date_str, court_name, court, timeslot, slot)
 
+        def publish():
+            publish_timeslot_change("leave", entry, user_id)
+            if promoted_id:
+                publish_timeslot_change("promote", entry, promoted_id)
 
-def clear_timeslot(
-    date: datetime,
-    court_name: str,
-    timeslot: str,
-) -> dict:
-    """Reset a timeslot to its default state."""
-    reservations = load_daily_reservations(date)
-    if not reservations:
-        return {"success": False, "message": "No reservations found for this date"}
-
-    court = reservations.root.get(court_name)
-    if not court:
-        return {"success": False, "message": f"Court '{court_name}' not found"}
+        committed = txn.commit(publish)
+    
+    if not committed:
+        return {"success": False, "message": "Error saving reservation"}
+    return result
 
-    slot = court.timeslots.get(timeslot)
-    if not slot:
-        return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
 
+def _reset_timeslot(slot: TimeSlot) -> tuple[list[str], list[str]]:
+    """Reset a slot to its default state; returns the removed (players, waitlist)."""
+    removed_players = list(slot.players_id)
+    removed_waitlist = list(slot.waitlist)
     slot.players_id = []
+    slot.waitlist = []
     slot.status = "available"
     slot.type = "public"
     slot.owner_id = None
@@ -534,9 +1054,137 @@ def clear_timeslot(
     slot.access_code = None
     slot.reservation_name = ""
     slot.court_type = ""
+    slot.version += 1
+    return removed_players, removed_waitlist
+
+
+def clear_timeslot(
+    date: datetime,
+    court_name: str,
+    timeslot: str,
+    expected_version: int | None = None,
+) -> dict:
+    """Reset a timeslot to its default state (optionally only at expected_version)."""
+    with day_store.transaction(date) as txn:
+        reservations = txn.reservations
+        if not reservations:
+            return {"success": False, "message": "No reservations found for this date"}
+
+        court = reservations.root.get(court_name)
+        if not court:
+            return {"success": False, "message": f"Court '{court_name}' not found"}
+
+        slot = court.timeslots.get(timeslot)
+        if not slot:
+            return {"success": False, "message": f"Timeslot '{timeslot}' not found"}
+
+        if expected_version is not None and slot.version != expected_version:
+            return _stale_version_result(slot)
+
+        removed_players, removed_waitlist = _reset_timeslot(slot)
+
+        entry = summarize_timeslot(date.strftime("%Y-%m-%d"), court_name, court, timeslot, slot)
+        committed = txn.commit(lambda: publish_timeslot_change(
+            "clear",
+            entry,
+            None,
+            removed_players=removed_players,
+            removed_waitlist=removed_waitlist,
+        ))
+
+    if committed:
+        return {"success": True, "version": entry["version"]}
+    return {"success": False, "message": "Error saving reservation"}
+
+
+def time_to_minutes(value: str) -> int:
+    """
+    Convert an HH:MM time (hour may lack its leading zero) to minutes past midnight.
+    
+    "24:00" is accepted as the end of the day (1440).
+    
+    Raises:
+        ValueError: If value is not a valid time
+    """
+    value = value.strip()
+    if value == "24:00":
+        return 24 * 60
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
 
-    if save_daily_reservations(date, reservations):
-        return {"success": True}
+
+def clear_timeslots(date: datetime, court_name: str, start_time: str, end_time: str) -> dict:
+    """
+    Clear every booking of a court overlapping a time range with one write.
+    
+    A booked slot is cleared when the room it holds (start plus duration_min)
+    overlaps the range, so a room starting before start_time but running
+    into the range is cancelled too. Only this day's slots are considered.
+    Empty slots are left alone. Each cleared slot is published as a "clear"
+    change, as clear_timeslot would.
+    
+    Args:
+        date: The date to clear
+        court_name: Name of the court
+        start_time: Start of the range (HH:MM, inclusive)
+        end_time: End of the range (HH:MM, exclusive; "24:00" = end of day)
+    
+    Returns:
+        Dictionary with success status and "cleared": one dict per cleared
+        slot with id, date, court, time, removed_players and removed_waitlist
+    """
+    try:
+        range_start, range_end = time_to_minutes(start_time), time_to_minutes(end_time)
+    except ValueError:
+        return {"success": False, "message": "Times must be in HH:MM format"}
+    
+    date_str = date.strftime("%Y-%m-%d")
+    with day_store.transaction(date) as txn:
+        reservations = txn.reservations
+        if not reservations:
+            return {"success": False, "message": "No reservations found for this date"}
+
+        court = reservations.root.get(court_name)
+        if not court:
+            return {"success": False, "message": f"Court '{court_name}' not found"}
+
+        cleared = []
+        entries = []
+        for time_str, slot in court.timeslots.items():
+            if not (slot.players_id or slot.waitlist or slot.owner_id):
+                continue
+            slot_start = time_to_minutes(time_str)
+            slot_end = slot_start + max(slot.duration_min or DEFAULT_DURATION_MIN, 1)
+            if not (slot_start < range_end and range_start < slot_end):
+                continue
+            removed_players, removed_waitlist = _reset_timeslot(slot)
+            entries.append((summarize_timeslot(date_str, court_name, court, time_str, slot), removed_players, removed_waitlist))
+            cleared.append({
+                "id": f"{date_str}|{court_name}|{time_str}",
+                "date": date_str,
+                "court": court_name,
+                "time": time_str,
+                "removed_players": removed_players,
+                "removed_waitlist": removed_waitlist,
+            })
+
+        if not cleared:
+            return {"success": True, "cleared": []}
+
+        def publish():
+            for entry, removed_players, removed_waitlist in entries:
+                publish_timeslot_change(
+                    "clear",
+                    entry,
+                    None,
+                    removed_players=removed_players,
+                    removed_waitlist=removed_waitlist,
+                )
+
+        committed = txn.commit(publish)
+
+    if committed:
+        return {"success": True, "cleared": cleared}
     return {"success": False, "message": "Error saving reservation"}
 
 
@@ -553,29 +1201,14 @@ def list_reservations_between(start_date: datetime, days: int = 7) -> list[dict]
             for time_str, slot in court.timeslots.items():
                 if not slot.owner_id and not slot.room_name and not slot.players_id:
                     continue
-                results.append(
-                    {
-                        "id": f"{date_str}|{court_name}|{time_str}",
-                        "date": date_str,
-                        "time": time_str,
-                        "court": court_name,
-                        "court_type": court.type.value,
-                        "capacity": court.capacity,
-                        "participants": slot.players_id,
-                        "owner_id": slot.owner_id,
-                        "room_name": slot.room_name,
-                        "privacy": slot.type,
-                        "duration_min": slot.duration_min,
-                        "status": slot.status,
-                        "access_code": slot.access_code,
-                        "reservation_name": slot.reservation_name,
-                        "activity_label": slot.court_type,
-                    }
-                )
+                results.append(summarize_timeslot(date_str, court_name, court, time_str, slot))
     return results
 
 
 # Example usage and testing
+# Self-test against the real storage directory. The package-relative imports
+# need module mode, from the repository root:
+#     python -m backend.utils.utilities
 if __name__ == "__main__":
     print("🧪 Testing utilities...\n")
     
@@ -0,0 +1,185 @@
+"""Write-behind group commit for day files.
+
+Each date has one live in-memory DailyReservations guarded by a lock.
+A mutation changes it under the lock, marks the day dirty and releases the
+lock, then waits until a write covering its change is durable. The first
+waiter becomes the flusher. It sleeps for up to max_delay_ms so that
+concurrent mutations of the same date can join the batch, then writes the
+whole day once. Mutations are therefore acknowledged only after their
+write, and one write covers every mutation in the batch.
+
+Post-commit callbacks (index updates, listeners) run in mutation order
+after the write succeeds. If the write fails, every mutation in the batch
+fails and the live copy is reloaded from disk.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+
+class _DayState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()  # guards reservations, dirty_seq, callbacks, fingerprint
+        self.cond = threading.Condition()  # guards committed_seq, failed_seq, flushing
+        self.reservations = None
+        self.fingerprint = None
+        self.dirty_seq = 0
+        self.callbacks: list[tuple[int, Callable[[], None]]] = []
+        self.committed_seq = 0
+        self.failed_seq = 0
+        self.flushing = False
+
+
+class Transaction:
+    """Exclusive access to one date's live reservations."""
+
+    def __init__(self, store: "GroupCommitStore", date: datetime, state: _DayState) -> None:
+        self._store = store
+        self._date = date
+        self._state = state
+        self._locked = True
+
+    @property
+    def reservations(self):
+        """The live DailyReservations, or None if the day file doesn't exist."""
+        return self._state.reservations
+
+    def commit(self, after: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Queue the changes made so far and wait until they are durable.
+
+        Releases the day lock before waiting, so other mutations can join the
+        same write.
+
+        Args:
+            after: Callback run once the write succeeds, in commit order
+
+        Returns:
+            True if the write covering this change succeeded
+        """
+        state = self._state
+        state.dirty_seq += 1
+        seq = state.dirty_seq
+        if after is not None:
+            state.callbacks.append((seq, after))
+        self.release()
+        return self._store._wait_durable(self._date, state, seq)
+
+    def release(self) -> None:
+        if self._locked:
+            self._locked = False
+            self._state.lock.release()
+
+
+class GroupCommitStore:
+    """
+    Group-commit writer for day files.
+
+    Args:
+        load: Read a date's reservations from disk (None if missing)
+        write: Durably write a date's model_dump() data; returns success
+        fingerprint: Identify the file version on disk, e.g. (mtime_ns, size)
+        max_delay_ms: How long a flusher waits for more mutations to join
+    """
+
+    def __init__(
+        self,
+        load: Callable[[datetime], object],
+        write: Callable[[datetime, dict], bool],
+        fingerprint: Callable[[datetime], object],
+        max_delay_ms: float = 2.0,
+    ) -> None:
+        self._load = load
+        self._write = write
+        self._fingerprint = fingerprint
+        self.max_delay_ms = max_delay_ms
+        self._states_lock = threading.Lock()
+        self._states: dict[str, _DayState] = {}
+
+    def _state(self, date: datetime) -> _DayState:
+        key = date.strftime("%Y-%m-%d")
+        with self._states_lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _DayState()
+            return state
+
+    @contextmanager
+    def transaction(self, date: datetime) -> Iterator[Transaction]:
+        """Lock a date and yield a Transaction over its live reservations."""
+        state = self._state(date)
+        state.lock.acquire()
+        txn = Transaction(self, date, state)
+        try:
+            with state.cond:
+                idle = state.dirty_seq <= max(state.committed_seq, state.failed_seq)
+            # With nothing pending, pick up changes written by someone else.
+            if state.reservations is None or (idle and self._fingerprint(date) != state.fingerprint):
+                state.reservations = self._load(date)
+                state.fingerprint = self._fingerprint(date) if state.reservations is not None else None
+            yield txn
+        finally:
+            txn.release()
+
+    def forget(self, date_str: str) -> None:
+        """Drop the live state of a date (e.g. after its file is deleted)."""
+        with self._states_lock:
+            self._states.pop(date_str, None)
+
+    def _wait_durable(self, date: datetime, state: _DayState, seq: int) -> bool:
+        while True:
+            with state.cond:
+                while True:
+                    if state.committed_seq >= seq:
+                        return True
+                    if state.failed_seq >= seq:
+                        return False
+                    if not state.flushing:
+                        state.flushing = True
+                        break
+                    state.cond.wait()
+            self._flush(date, state)
+
+    def _flush(self, date: datetime, state: _DayState) -> None:
+        if self.max_delay_ms > 0:
+            time.sleep(self.max_delay_ms / 1000)
+
+        with state.lock:
+            target = state.dirty_seq
+            data = state.reservations.model_dump() if state.reservations is not None else None
+            callbacks = [callback for seq, callback in state.callbacks if seq <= target]
+            state.callbacks = [(seq, callback) for seq, callback in state.callbacks if seq > target]
+
+        ok = False
+        if data is not None:
+            try:
+                ok = self._write(date, data)
+            except Exception as e:
+                print(f"Error committing reservations for {date.date()}: {e}")
+
+        with state.lock:
+            if ok:
+                state.fingerprint = self._fingerprint(date)
+            else:
+                # The live copy holds changes that never reached disk: fail
+                # everything applied to it so far and reload on next use.
+                target = state.dirty_seq
+                state.reservations = None
+                state.callbacks = []
+        if ok:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in post-commit callback: {e}")
+
+        with state.cond:
+            if ok:
+                state.committed_seq = target
+            else:
+                state.failed_seq = target
+            state.flushing = False
+            state.cond.notify_all()
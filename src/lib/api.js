@@ -47,7 +47,23 @@ export async function fetchRoomsFromApi(studentId, signal) {
   if (studentId) params.append('student_id', studentId)
   const suffix = params.toString() ? `?${params.toString()}` : ''
   const data = await request(`/rooms${suffix}`, { method: 'GET', signal })
-  return data?.rooms || []
+  return {
+    rooms: data?.rooms || [],
+    cursor: { seq: data?.seq ?? 0, epoch: data?.epoch || null },
+  }
+}
+
+export async function fetchRoomChangesApi(studentId, cursor, signal) {
+  const params = new URLSearchParams({ since: String(cursor.seq) })
+  if (cursor.epoch) params.append('epoch', cursor.epoch)
+  if (studentId) params.append('student_id', studentId)
+  const data = await request(`/rooms/changes?${params.toString()}`, { method: 'GET', signal })
+  return {
+    reset: Boolean(data?.reset),
+    rooms: data?.rooms || [],
+    removed: data?.removed || [],
+    cursor: { seq: data?.seq ?? 0, epoch: data?.epoch || null },
+  }
 }
 
 export async function createRoomApi(payload) {
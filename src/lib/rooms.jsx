@@ -1,10 +1,31 @@
 import React, { createContext, useContext, useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import { loadRooms, saveRooms, saveRoomsSilent, ROOMS_UPDATED_EVENT } from './storage'
-import { fetchRoomsFromApi } from './api'
+import { fetchRoomChangesApi, fetchRoomsFromApi } from './api'
 import { useAuth } from './auth'
 
 const RoomsCtx = createContext(null)
 
+function todayKey() {
+  return new Date().toDateString()
+}
+
+// Apply a change-feed page: upsert changed rooms, drop cleared ones.
+function applyRoomChanges(rooms, changes) {
+  const changed = new Map(changes.rooms.map(room => [room.id, room]))
+  const removed = new Set(changes.removed)
+  const next = []
+  for (const room of rooms) {
+    if (removed.has(room.id)) continue
+    if (changed.has(room.id)) {
+      next.push(changed.get(room.id))
+      changed.delete(room.id)
+    } else {
+      next.push(room)
+    }
+  }
+  return next.concat(Array.from(changed.values()))
+}
+
 export function RoomsProvider({ children }) {
   const { studentId } = useAuth()
   const [rooms, setRoomsState] = useState([])
@@ -15,6 +36,9 @@ export function RoomsProvider({ children }) {
   const storageDebounceRef = useRef(null)
   const lastStorageSyncAtRef = useRef(0)
   const abortRef = useRef(null)
+  // Change-feed cursor of the rooms we hold; null forces a full refetch.
+  const cursorRef = useRef(null)
+  const roomsRef = useRef([])
 
   const syncFromStorage = useCallback(async () => {
     if (isSyncingRef.current) return
@@ -26,17 +50,34 @@ export function RoomsProvider({ children }) {
         try { abortRef.current.abort() } catch {}
       }
       abortRef.current = new AbortController()
-      const fromApi = await fetchRoomsFromApi(studentId, abortRef.current.signal)
+      const signal = abortRef.current.signal
+      const cursor = cursorRef.current
+      let fromApi = null
+      if (cursor && cursor.day === todayKey()) {
+        const changes = await fetchRoomChangesApi(studentId, cursor, signal)
+        if (!changes.reset) {
+          fromApi = applyRoomChanges(roomsRef.current, changes)
+          cursorRef.current = { ...changes.cursor, day: cursor.day }
+        }
+      }
+      if (!fromApi) {
+        const listing = await fetchRoomsFromApi(studentId, signal)
+        fromApi = listing.rooms
+        cursorRef.current = { ...listing.cursor, day: todayKey() }
+      }
       setSupportsApi(true)
+      roomsRef.current = fromApi
       setRoomsState(fromApi)
       // Persist without re-broadcasting to avoid triggering our own listener
       saveRoomsSilent(fromApi)
       setError(null)
     } catch (err) {
       console.warn('Falling back to local storage for rooms', err)
+      cursorRef.current = null
       setSupportsApi(false)
       setError(err?.message || 'Unable to reach server')
       const fallback = loadRooms()
+      roomsRef.current = fallback
       setRoomsState(fallback)
     } finally {
       setIsLoading(false)
@@ -46,6 +87,8 @@ export function RoomsProvider({ children }) {
 
   useEffect(() => {
     if (typeof window === 'undefined') return
+    // Access codes in the cache depend on the student, so start over.
+    cursorRef.current = null
     syncFromStorage()
     const handleStorage = (event) => {
       if (event && event.key && event.key !== 'rooms') return
@@ -71,6 +114,9 @@ export function RoomsProvider({ children }) {
     setRoomsState(prev => {
       const next = typeof updater === 'function' ? updater(prev) : updater
       if (next === prev) return prev
+      // Local edits aren't in the server's feed; resync fully next time.
+      cursorRef.current = null
+      roomsRef.current = next
       saveRooms(next)
       return next
     })